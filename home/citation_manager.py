@@ -1,22 +1,34 @@
-from typing import List, Dict
+from typing import Dict, Iterator, List
+from functools import lru_cache
+import copy
 import re
+import threading
+
+# Placeholders FactExtractor returns when nothing specific was found; consumers compare
+# against these constants instead of repeating the literals
+DEFAULT_ARCHITECTURE = 'deep neural network architecture'
+DEFAULT_DATASET = 'benchmark datasets'
+DEFAULT_TRAINING = 'standard training procedure'
+DEFAULT_CHALLENGE = 'challenges in generalization and robustness across diverse conditions'
 
 
 class CitationManager:
     def __init__(self):
         self.citations = []
         self.citation_map = {}
+        self._lock = threading.Lock()
         
     def add_citation(self, paper: Dict) -> int:
         citation_key = paper.get('doi', '') or paper.get('title', '')
         
-        if citation_key in self.citation_map:
-            return self.citation_map[citation_key]
-        
-        citation_num = len(self.citations) + 1
-        self.citations.append(paper)
-        self.citation_map[citation_key] = citation_num
-        return citation_num
+        with self._lock:
+            if citation_key in self.citation_map:
+                return self.citation_map[citation_key]
+            
+            citation_num = len(self.citations) + 1
+            self.citations.append(paper)
+            self.citation_map[citation_key] = citation_num
+            return citation_num
     
     def get_citation_text(self, citation_nums: List[int]) -> str:
         return f"[{', '.join(map(str, citation_nums))}]"
@@ -49,10 +61,14 @@ class CitationManager:
             citation += f" {url}"
         return citation
     
+    def iter_entries(self) -> Iterator[str]:
+        for i, paper in enumerate(self.citations, 1):
+            yield self.format_citation_apa(paper, i)
+    
     def generate_bibliography(self) -> str:
         bib_lines = ["REFERENCES", "=" * 80, ""]
-        for i, paper in enumerate(self.citations, 1):
-            bib_lines.append(self.format_citation_apa(paper, i))
+        for entry in self.iter_entries():
+            bib_lines.append(entry)
             bib_lines.append("")
         return "\n".join(bib_lines)
 
@@ -60,9 +76,14 @@ class CitationManager:
 class FactExtractor:
     @staticmethod
     def extract_facts(paper: Dict) -> Dict:
-        abstract = paper.get('abstract', '')
-        title = paper.get('title', '')
-        
+        # Facts depend only on title and abstract; deep-copy so callers never mutate the cached entry
+        return copy.deepcopy(
+            FactExtractor._extract_facts_cached(paper.get('title', ''), paper.get('abstract', ''))
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _extract_facts_cached(title: str, abstract: str) -> Dict:
         facts = {
             'method': FactExtractor._extract_methods(abstract, title),
             'finding': FactExtractor._extract_findings(abstract),
@@ -230,7 +251,7 @@ class FactExtractor:
         if 'transfer learning' in combined_text:
             details.append('transfer learning')
         
-        return '; '.join(details) if details else 'deep neural network architecture'
+        return '; '.join(details) if details else DEFAULT_ARCHITECTURE
     
     @staticmethod
     def _extract_dataset_info(text: str) -> str:
@@ -293,7 +314,7 @@ class FactExtractor:
         if 'dataset' in text_lower:
             return 'custom dataset'
         
-        return 'benchmark datasets'
+        return DEFAULT_DATASET
     
     @staticmethod
     def _extract_training_details(text: str) -> str:
@@ -344,7 +365,7 @@ class FactExtractor:
             if decay_match:
                 details.append(f"weight decay {decay_match.group(1)}")
         
-        return '; '.join(details) if details else 'standard training procedure'
+        return '; '.join(details) if details else DEFAULT_TRAINING
     
     @staticmethod
     def _extract_detailed_metrics(text: str) -> Dict[str, str]:
@@ -560,7 +581,7 @@ class FactExtractor:
                         if keyword in sentence.lower() and len(sentence.strip()) > 20:
                             return sentence.strip()
         
-        return 'challenges in generalization and robustness across diverse conditions'
+        return DEFAULT_CHALLENGE
     
     @staticmethod
     def _extract_applications(text: str, title: str) -> str:
@@ -2,13 +2,172 @@
 Enhanced Proposal Generator using OpenAI with RAG data
 Generates complete, well-cited proposals from comprehensive research data
 """
+import io
 import os
+import re
 import json
-from typing import Dict, List, Any, Generator
-from openai import OpenAI
+import heapq
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, List, Any, Generator, MutableMapping
+import httpx
+import numpy as np
+from openai import OpenAI, RateLimitError, APITimeoutError, APIConnectionError
+from tenacity import retry, retry_if_exception_type, wait_exponential, stop_after_attempt
 from authentication.models import ProposalType, ProposalTemplate, SavedProposal
+from .enhanced_rag_system import _build_keyword_matcher
 import time
 
+try:
+    import diskcache
+except ImportError:  # optional: falls back to an in-process dict
+    diskcache = None
+
+try:
+    import tiktoken
+except ImportError:  # optional: falls back to a characters-per-token estimate
+    tiktoken = None
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib json module
+    orjson = None
+
+
+_WORD_RE = re.compile(r'\S+')
+
+
+def _sse_frame(update: Dict[str, Any]) -> bytes:
+    """Encode an update as a Server-Sent Events data frame"""
+    if orjson is not None:
+        return b"data: " + orjson.dumps(update, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+    return f"data: {json.dumps(update)}\n\n".encode()
+
+
+def _word_count(text: str) -> int:
+    """Whitespace-delimited words, counted without building a list"""
+    return sum(1 for _ in _WORD_RE.finditer(text or ''))
+
+
+def _section_max_tokens(max_words: int) -> int:
+    """Completion tokens for up to max_words of markdown: ~1.6 tokens per word plus headroom"""
+    return int(max_words * 1.6) + 128
+
+
+def _is_complete_json(text: str) -> bool:
+    """Cheap check that accumulated JSON output is not cut off before parsing it"""
+    text = (text or '').rstrip()
+    return text.endswith('}') or text.endswith(']')
+
+
+# Extra completion tokens per batched section for its JSON key, quotes and escapes
+_BATCH_JSON_OVERHEAD = 64
+
+_BATCH_OUTPUT_FORMAT = """
+
+OUTPUT FORMAT:
+Return a single JSON object whose keys are exactly the section names and whose
+values are the markdown content of each section (without the section title)."""
+
+
+# Section-specific paper selection keywords, keyed by lowercased section name fragment;
+# the matchers are applied to lowercased paper text
+_SECTION_KEYWORDS = {
+    'introduction': ('background', 'context', 'motivation', 'problem'),
+    'background': ('history', 'evolution', 'previous', 'existing'),
+    'literature review': ('review', 'survey', 'comparative', 'analysis'),
+    'methodology': ('method', 'approach', 'technique', 'algorithm', 'framework'),
+    'innovation': ('novel', 'new', 'innovative', 'breakthrough', 'advanced'),
+    'impact': ('impact', 'benefit', 'application', 'deployment', 'real-world'),
+    'work plan': ('plan', 'timeline', 'schedule', 'milestone', 'deliverable'),
+}
+
+
+_SECTION_MATCHERS = {
+    name: _build_keyword_matcher(keywords) for name, keywords in _SECTION_KEYWORDS.items()
+}
+
+
+# Per-paper prompt formats, filled with str.format_map
+_PAPER_TEMPLATE = "- {citation_key}: {title} ({authors}, {year})"
+_PAPER_DETAILS_TEMPLATE = (
+    "**Title:** {title}\n"
+    "**Authors:** {authors}\n"
+    "**Year:** {year}\n"
+    "**Abstract:** {abstract}...\n"
+    "**Citation:** {apa_citation}\n"
+    "**Citation Key:** `{citation_key}`"
+)
+
+
+class _LRUCache(OrderedDict):
+    """Small thread-safe in-memory LRU mapping used as the default response cache"""
+
+    def __init__(self, maxsize: int = 256):
+        super().__init__()
+        self.maxsize = maxsize
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            value = super().__getitem__(key)
+            self.move_to_end(key)
+            return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                self.popitem(last=False)
+
+
+@dataclass(frozen=True, slots=True)
+class RagContext:
+    """
+    Read-only view of RAG data with the top-N slices used in prompts taken once
+    `memo` holds values derived from the papers while one proposal is generated
+    """
+    total_papers: int
+    top_themes: List[tuple]
+    top_methodologies: List[str]
+    top_datasets: List[str]
+    top_timeline: List[tuple]
+    top_researchers: List[Dict]
+    top_gaps: List[str]
+    papers: List[Dict]
+    bibliography: Dict
+    memo: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, rag_data: Dict[str, Any]) -> 'RagContext':
+        """Build from the dict returned by the RAG system"""
+        return cls(
+            total_papers=rag_data.get('total_papers', 0),
+            top_themes=[
+                (theme, len(papers))
+                for theme, papers in islice((rag_data.get('themes') or {}).items(), 10)
+            ],
+            top_methodologies=list(islice(rag_data.get('methodologies') or (), 15)),
+            top_datasets=list(islice(rag_data.get('datasets') or (), 10)),
+            top_timeline=list(deque((rag_data.get('timeline') or {}).items(), maxlen=10)),
+            top_researchers=list(islice(rag_data.get('key_researchers') or (), 10)),
+            top_gaps=list(islice(rag_data.get('research_gaps') or (), 5)),
+            papers=rag_data.get('papers', []),
+            bibliography=rag_data.get('bibliography', {})
+        )
+
 
 class EnhancedProposalGenerator:
     """
@@ -17,15 +176,71 @@ class EnhancedProposalGenerator:
     the proposal with perfect citation integration.
     """
 
-    def __init__(self, api_key: str = None):
-        """Initialize the proposal generator with OpenAI API"""
+    def __init__(
+        self,
+        api_key: str = None,
+        cache: MutableMapping = None,
+        reranker_model: str = None,
+        embedding_model: str = None
+    ):
+        """
+        Initialize the proposal generator with OpenAI API
+
+        `cache` may be any mapping (e.g. a diskcache.Cache) used to store
+        completions; defaults to an in-memory LRU.
+        `reranker_model` names a sentence-transformers cross-encoder
+        (e.g. "BAAI/bge-reranker-base") used to rerank papers per section;
+        defaults to the PROPOSAL_RERANKER_MODEL environment variable.
+        `embedding_model` names an OpenAI embedding model (e.g.
+        "text-embedding-3-small") used to select papers by semantic
+        similarity; defaults to the PROPOSAL_EMBEDDING_MODEL environment variable.
+        """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         if not self.api_key:
             raise ValueError("OpenAI API key not provided")
 
-        self.client = OpenAI(api_key=self.api_key)
+        # Pooled HTTP/2 connections shared by every request; retries are
+        # handled by _create_completion instead of the client
+        self.client = OpenAI(
+            api_key=self.api_key,
+            max_retries=0,
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+                timeout=httpx.Timeout(120.0, connect=5.0)
+            )
+        )
         self.model = "gpt-4-turbo-preview"  # or "gpt-4o" for latest
         self.max_tokens = 4096
+        self.context_window = 128000
+        self._encoding = None
+
+        # Completions keyed by (model, prompts, temperature)
+        self.cache = cache if cache is not None else _LRUCache(maxsize=256)
+
+        # Optional cross-encoder reranking
+        self.reranker_model = reranker_model or os.getenv('PROPOSAL_RERANKER_MODEL')
+        self._reranker = None
+        self.rerank_candidates = 100
+
+        # Optional embedding-based selection
+        self.embedding_model = embedding_model or os.getenv('PROPOSAL_EMBEDDING_MODEL')
+
+        # Embeddings keyed by model and content hash, persisted across proposals
+        self.embedding_cache: MutableMapping = {}
+        if self.embedding_model and diskcache is not None:
+            self.embedding_cache = diskcache.Index(
+                os.getenv('PROPOSAL_EMBEDDING_CACHE_DIR', 'emb_cache')
+            )
+
+    @property
+    def max_papers(self) -> int:
+        """Papers per section prompt; better selection allows fewer"""
+        if self.reranker_model:
+            return 15
+        if self.embedding_model:
+            return 10
+        return 30
 
     def generate_complete_proposal(
         self,
@@ -34,80 +249,134 @@ class EnhancedProposalGenerator:
         keywords: str,
         description: str,
         rag_data: Dict[str, Any],
-        user_requirements: Dict[str, Any] = None
+        user_requirements: Dict[str, Any] = None,
+        ignore_cache: bool = False,
+        batch_sections: bool = False
     ) -> Generator[Dict[str, Any], None, None]:
         """
         Generate a complete proposal section by section using RAG data
         Yields progress updates as sections are generated
+        Set ignore_cache to force fresh completions (explicit regeneration)
+        Set batch_sections to generate groups of sections in single JSON requests
         """
-        # Get templates for this proposal type
-        templates = proposal_type.templates.all().order_by('section_order')
+        # Get templates for this proposal type in a single query; the
+        # proposal type is joined in so prompts don't query it per section
+        templates = list(
+            proposal_type.templates.select_related('proposal_type').order_by('section_order')
+        )
+        total_sections = len(templates)
+        proposal_type_name = proposal_type.name
 
-        if not templates.exists():
+        if not templates:
             yield {
                 'type': 'error',
-                'message': f'No templates found for {proposal_type.name}'
+                'message': f'No templates found for {proposal_type_name}'
             }
             return
 
         yield {
             'type': 'info',
-            'message': f'Starting generation of {proposal_type.name} proposal',
-            'total_sections': templates.count()
+            'message': f'Starting generation of {proposal_type_name} proposal',
+            'total_sections': total_sections
         }
 
         # Prepare context from RAG data
-        research_context = self._prepare_research_context(rag_data)
+        rag_context = RagContext.from_dict(rag_data)
+        research_context = self._prepare_research_context(rag_context)
+
+        # Requests sharing a prompt prefix are routed together so OpenAI's
+        # automatic prompt caching can reuse it across sections
+        cache_user = "proposal-" + hashlib.sha256(research_context.encode()).hexdigest()[:16]
 
         # Generate proposal metadata
         proposal_metadata = {
             'title': title,
             'keywords': keywords,
             'description': description,
-            'proposal_type': proposal_type.name,
-            'total_papers': rag_data.get('total_papers', 0),
+            'proposal_type': proposal_type_name,
+            'total_papers': rag_context.total_papers,
             'generated_sections': []
         }
 
-        # Generate each section
-        for idx, template in enumerate(templates, 1):
-            yield {
-                'type': 'section_start',
-                'section_name': template.section_name,
-                'section_number': idx,
-                'total_sections': templates.count()
-            }
-
-            try:
-                # Generate section content
-                section_content = self._generate_section(
-                    template=template,
-                    title=title,
-                    description=description,
-                    research_context=research_context,
-                    rag_data=rag_data,
-                    user_requirements=user_requirements
-                )
-
-                proposal_metadata['generated_sections'].append({
-                    'name': template.section_name,
-                    'content': section_content,
-                    'word_count': len(section_content.split())
-                })
+        # Group sections so several share one request when batching
+        if batch_sections:
+            groups = self._group_templates_for_batch(templates)
+        else:
+            groups = [[template] for template in templates]
 
+        # Generate each section
+        idx = 0
+        for group in groups:
+            batched = {}
+            if len(group) > 1:
+                try:
+                    batched = self._generate_sections_batched(
+                        templates_group=group,
+                        title=title,
+                        description=description,
+                        research_context=research_context,
+                        rag_context=rag_context,
+                        user_requirements=user_requirements,
+                        ignore_cache=ignore_cache
+                    )
+                except Exception:
+                    # Fall back to per-section generation below
+                    batched = {}
+
+            for template in group:
+                idx += 1
                 yield {
-                    'type': 'section_complete',
+                    'type': 'section_start',
                     'section_name': template.section_name,
-                    'content': section_content,
-                    'word_count': len(section_content.split())
+                    'section_number': idx,
+                    'total_sections': total_sections
                 }
 
-            except Exception as e:
-                yield {
-                    'type': 'section_error',
-                    'section_name': template.section_name,
-                    'error': str(e)
-                }
+                try:
+                    if template.section_name in batched:
+                        section_content = batched[template.section_name]
+                    else:
+                        # Stream section content token by token
+                        chunks = []
+                        for delta in self._generate_section(
+                            template=template,
+                            title=title,
+                            description=description,
+                            research_context=research_context,
+                            rag_context=rag_context,
+                            user_requirements=user_requirements,
+                            ignore_cache=ignore_cache,
+                            cache_user=cache_user
+                        ):
+                            chunks.append(delta)
+                            yield {
+                                'type': 'token',
+                                'section_name': template.section_name,
+                                'delta': delta
+                            }
+                        section_content = "".join(chunks)
+
+                    word_count = _word_count(section_content)
+
+                    proposal_metadata['generated_sections'].append({
+                        'name': template.section_name,
+                        'content': section_content,
+                        'word_count': word_count
+                    })
+
+                    yield {
+                        'type': 'section_complete',
+                        'section_name': template.section_name,
+                        'content': section_content,
+                        'word_count': word_count
+                    }
+
+                except Exception as e:
+                    yield {
+                        'type': 'section_error',
+                        'section_name': template.section_name,
+                        'error': str(e)
+                    }
 
         # Compile full proposal
         full_proposal = self._compile_proposal(proposal_metadata)
@@ -116,65 +385,64 @@ class EnhancedProposalGenerator:
             'type': 'complete',
             'full_proposal': full_proposal,
             'metadata': proposal_metadata,
-            'bibliography': rag_data.get('bibliography', {}),
+            'bibliography': rag_context.bibliography,
             'total_words': sum(s['word_count'] for s in proposal_metadata['generated_sections'])
         }
 
-    def _prepare_research_context(self, rag_data: Dict[str, Any]) -> str:
+    def _prepare_research_context(self, rag_context: RagContext) -> str:
         """Prepare comprehensive research context from RAG data"""
-        context_parts = []
+        buf = io.StringIO()
+        w = buf.write
 
         # Overview
-        context_parts.append(f"# Research Context")
-        context_parts.append(f"Total Papers Analyzed: {rag_data.get('total_papers', 0)}")
-        context_parts.append("")
+        w(f"# Research Context\nTotal Papers Analyzed: {rag_context.total_papers}\n\n")
 
         # Key themes
-        if rag_data.get('themes'):
-            context_parts.append("## Major Research Themes:")
-            for theme, papers in list(rag_data['themes'].items())[:10]:
-                context_parts.append(f"- {theme}: {len(papers)} papers")
-            context_parts.append("")
+        if rag_context.top_themes:
+            w("## Major Research Themes:\n")
+            for theme, paper_count in rag_context.top_themes:
+                w(f"- {theme}: {paper_count} papers\n")
+            w("\n")
 
         # Methodologies
-        if rag_data.get('methodologies'):
-            context_parts.append("## Common Methodologies:")
-            for method in rag_data['methodologies'][:15]:
-                context_parts.append(f"- {method}")
-            context_parts.append("")
+        if rag_context.top_methodologies:
+            w("## Common Methodologies:\n")
+            for method in rag_context.top_methodologies:
+                w(f"- {method}\n")
+            w("\n")
 
         # Datasets
-        if rag_data.get('datasets'):
-            context_parts.append("## Frequently Used Datasets:")
-            for dataset in rag_data['datasets'][:10]:
-                context_parts.append(f"- {dataset}")
-            context_parts.append("")
+        if rag_context.top_datasets:
+            w("## Frequently Used Datasets:\n")
+            for dataset in rag_context.top_datasets:
+                w(f"- {dataset}\n")
+            w("\n")
 
         # Research timeline
-        if rag_data.get('timeline'):
-            context_parts.append("## Publication Timeline:")
-            for year, count in list(rag_data['timeline'].items())[-10:]:
-                context_parts.append(f"- {year}: {count} papers")
-            context_parts.append("")
+        if rag_context.top_timeline:
+            w("## Publication Timeline:\n")
+            for year, count in rag_context.top_timeline:
+                w(f"- {year}: {count} papers\n")
+            w("\n")
 
         # Key researchers
-        if rag_data.get('key_researchers'):
-            context_parts.append("## Key Researchers:")
-            for researcher in rag_data['key_researchers'][:10]:
-                context_parts.append(
+        if rag_context.top_researchers:
+            w("## Key Researchers:\n")
+            for researcher in rag_context.top_researchers:
+                w(
                     f"- {researcher['name']}: {researcher['paper_count']} papers, "
-                    f"{researcher['total_citations']} citations"
+                    f"{researcher['total_citations']} citations\n"
                 )
-            context_parts.append("")
+            w("\n")
 
         # Research gaps
-        if rag_data.get('research_gaps'):
-            context_parts.append("## Identified Research Gaps:")
-            for gap in rag_data['research_gaps'][:5]:
-                context_parts.append(f"- {gap}")
-            context_parts.append("")
+        if rag_context.top_gaps:
+            w("## Identified Research Gaps:\n")
+            for gap in rag_context.top_gaps:
+                w(f"- {gap}\n")
+            w("\n")
 
-        return "\n".join(context_parts)
+        return buf.getvalue()
 
     def _generate_section(
         self,
@@ -182,55 +450,175 @@ class EnhancedProposalGenerator:
         title: str,
         description: str,
         research_context: str,
-        rag_data: Dict[str, Any],
-        user_requirements: Dict[str, Any] = None
-    ) -> str:
-        """Generate a single section using OpenAI with RAG data"""
+        rag_context: RagContext,
+        user_requirements: Dict[str, Any] = None,
+        ignore_cache: bool = False,
+        cache_user: str = None
+    ) -> Generator[str, None, None]:
+        """Generate a single section using OpenAI with RAG data, yielding content deltas"""
+
+        # Read template fields once; the prompt builders take them explicitly
+        section_name = template.section_name
+        section_description = template.description
+        min_words, max_words = template.min_words, template.max_words
 
         # Select most relevant papers for this section
         relevant_papers = self._select_relevant_papers(
-            section_name=template.section_name,
-            papers=rag_data.get('papers', []),
-            max_papers=30
+            section_name=section_name,
+            papers=rag_context.papers,
+            max_papers=self.max_papers,
+            section_description=section_description,
+            memo=rag_context.memo
         )
 
+        # Size the response to the section rather than the model maximum
+        max_tokens = self.max_tokens
+        if max_words:
+            max_tokens = min(self.max_tokens, _section_max_tokens(max_words))
+
         # Build comprehensive prompt
-        system_prompt = self._build_system_prompt(template, rag_data)
+        system_prompt = self._build_system_prompt(template.proposal_type.name)
         user_prompt = self._build_user_prompt(
-            template=template,
+            section_name=section_name,
+            prompt_template=template.prompt_template,
+            min_words=min_words,
+            max_words=max_words,
+            is_required=template.is_required,
+            section_description=section_description,
             title=title,
             description=description,
             research_context=research_context,
             relevant_papers=relevant_papers,
-            user_requirements=user_requirements
+            user_requirements=user_requirements,
+            token_budget=self.context_window - self._count_tokens(system_prompt) - max_tokens,
+            memo=rag_context.memo
         )
 
+        params = {
+            'top_p': 0.9,
+            'frequency_penalty': 0.3,
+            'presence_penalty': 0.3,
+            'max_tokens': max_tokens
+        }
+        if cache_user:
+            params['user'] = cache_user
+
         # Generate content with OpenAI
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+            yield from self._stream_complete(
+                system_prompt,
+                user_prompt,
                 temperature=0.7,
-                max_tokens=self.max_tokens,
-                top_p=0.9,
-                frequency_penalty=0.3,
-                presence_penalty=0.3
+                ignore_cache=ignore_cache,
+                **params
             )
 
-            content = response.choices[0].message.content
-            return content
-
         except Exception as e:
-            raise Exception(f"Error generating section {template.section_name}: {str(e)}")
+            raise Exception(f"Error generating section {section_name}: {str(e)}")
 
-    def _build_system_prompt(self, template: ProposalTemplate, rag_data: Dict) -> str:
-        """Build system prompt for OpenAI"""
-        return f"""You are an expert grant proposal writer specializing in {template.proposal_type.name} proposals.
+    def _cache_key(self, system_prompt: str, user_prompt: str, temperature: float) -> bytes:
+        """Hash the request inputs that determine a completion"""
+        return hashlib.sha256(
+            "\0".join((self.model, system_prompt, user_prompt, str(temperature))).encode()
+        ).digest()
 
-Your task is to write the "{template.section_name}" section of a grant proposal.
+    def _complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        ignore_cache: bool = False,
+        **params
+    ) -> str:
+        """Run a chat completion, serving identical requests from the cache"""
+        key = self._cache_key(system_prompt, user_prompt, temperature)
+        if not ignore_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        response = self._create_completion(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=temperature,
+            max_tokens=params.pop('max_tokens', self.max_tokens),
+            **params
+        )
+
+        content = response.choices[0].message.content
+        if content:
+            self.cache[key] = content
+        return content
+
+    @retry(
+        retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+        wait=wait_exponential(multiplier=1, min=1, max=32),
+        stop=stop_after_attempt(5),
+        reraise=True
+    )
+    def _create_completion(self, **kwargs):
+        """Create a chat completion, retrying transient errors with exponential backoff"""
+        return self.client.chat.completions.create(**kwargs)
+
+    def _stream_complete(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        ignore_cache: bool = False,
+        **params
+    ) -> Generator[str, None, None]:
+        """
+        Stream a chat completion as content deltas
+        A cached completion is yielded as a single delta. Closing the generator
+        closes the underlying HTTP stream, cancelling generation early.
+        """
+        key = self._cache_key(system_prompt, user_prompt, temperature)
+        if not ignore_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        stream = self._create_completion(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=temperature,
+            max_tokens=params.pop('max_tokens', self.max_tokens),
+            stream=True,
+            **params
+        )
+
+        chunks = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+        finally:
+            stream.close()
+
+        if chunks:
+            self.cache[key] = "".join(chunks)
+
+    def _build_system_prompt(self, proposal_type_name: str) -> str:
+        """
+        Build system prompt for OpenAI
+        Kept identical for every section of a proposal type so it forms a
+        cacheable prompt prefix; section requirements go in the user prompt.
+        """
+        return f"""You are an expert grant proposal writer specializing in {proposal_type_name} proposals.
+
+Your task is to write sections of a grant proposal.
 
 CRITICAL CITATION REQUIREMENTS:
 1. You MUST use ONLY the papers provided in the research data
@@ -240,11 +628,6 @@ CRITICAL CITATION REQUIREMENTS:
 5. Use the exact citation keys provided in the paper data
 6. When citing multiple sources, use: (Author1, Year1; Author2, Year2)
 
-SECTION REQUIREMENTS:
-- Word count: {template.min_words} - {template.max_words} words
-- Required: {template.is_required}
-- Description: {template.description}
-
 WRITING STYLE:
 - Academic and professional
 - Clear and concise
@@ -263,150 +646,425 @@ Remember: Quality over quantity. Every statement should add value to the proposa
 
     def _build_user_prompt(
         self,
-        template: ProposalTemplate,
+        section_name: str,
+        prompt_template: str,
+        min_words: int,
+        max_words: int,
+        is_required: bool,
+        section_description: str,
         title: str,
         description: str,
         research_context: str,
         relevant_papers: List[Dict],
-        user_requirements: Dict = None
+        user_requirements: Dict = None,
+        token_budget: int = None,
+        memo: Dict[str, Any] = None
     ) -> str:
-        """Build user prompt with all context"""
+        """
+        Build user prompt with all context
+        Invariant context comes first and the section-specific task last, so
+        consecutive sections share the longest possible prompt prefix.
+        With a token budget, papers are added only while they fit.
+        """
 
-        prompt_parts = []
+        # Proposal overview and research context
+        head = (
+            f"# Proposal Overview\n**Title:** {title}\n**Description:** {description}\n\n"
+            f"{research_context}\n\n"
+            "# Relevant Research Papers\nUse ONLY these papers for citations:\n\n"
+        )
 
-        # Proposal overview
-        prompt_parts.append(f"# Proposal Overview")
-        prompt_parts.append(f"**Title:** {title}")
-        prompt_parts.append(f"**Description:** {description}")
-        prompt_parts.append("")
+        buf = io.StringIO()
+        w = buf.write
 
-        # Research context
-        prompt_parts.append(research_context)
-        prompt_parts.append("")
+        # Section-specific instructions
+        w(
+            f"# Your Task\n"
+            f"Write the **{section_name}** section following this guidance:\n"
+            f"{prompt_template}\n\n"
+            f"## Section Requirements\n"
+            f"- Word count: {min_words} - {max_words} words\n"
+            f"- Required: {is_required}\n"
+            f"- Description: {section_description}\n\n"
+        )
+
+        # Additional requirements
+        if user_requirements:
+            w("# Additional Requirements:\n")
+            for key, value in user_requirements.items():
+                w(f"- {key}: {value}\n")
+            w("\n")
+
+        # Final instructions
+        w(
+            "# Final Instructions:\n"
+            "1. Write ONLY the section content, do not include a title\n"
+            "2. Cite papers using their citation keys\n"
+            "3. Ensure all claims are supported by the provided papers\n"
+            "4. Meet the word count requirements\n"
+            "5. Use professional academic language\n\n"
+            "Begin writing now:"
+        )
+        tail = buf.getvalue()
 
         # Relevant papers with full details
-        prompt_parts.append("# Relevant Research Papers")
-        prompt_parts.append("Use ONLY these papers for citations:")
-        prompt_parts.append("")
-
-        for i, paper in enumerate(relevant_papers, 1):
-            prompt_parts.append(f"## Paper {i}: {paper['citation_key']}")
-            prompt_parts.append(f"**Title:** {paper['title']}")
-            prompt_parts.append(f"**Authors:** {', '.join(paper['authors'][:5])}")
-            prompt_parts.append(f"**Year:** {paper['year']}")
-            prompt_parts.append(f"**Abstract:** {paper['abstract'][:500]}...")
-            prompt_parts.append(f"**Citation:** {paper['apa_citation']}")
-            prompt_parts.append(f"**Citation Key:** `{paper['citation_key']}`")
-            prompt_parts.append("")
+        paper_budget = None
+        if token_budget is not None:
+            paper_budget = token_budget - self._count_tokens(head) - self._count_tokens(tail)
 
-        # Section-specific instructions
-        prompt_parts.append(f"# Your Task")
-        prompt_parts.append(f"Write the **{template.section_name}** section following this guidance:")
-        prompt_parts.append(template.prompt_template)
-        prompt_parts.append("")
+        return head + self._format_paper_block(relevant_papers, paper_budget, memo) + tail
+
+    def _format_paper_block(
+        self,
+        papers: List[Dict],
+        token_budget: int = None,
+        memo: Dict[str, Any] = None
+    ) -> str:
+        """Format papers with full details for a generation prompt, stopping at the token budget"""
+        details_cache = memo.setdefault('paper_details', {}) if memo is not None else {}
+        buf = io.StringIO()
+        for i, paper in enumerate(papers, 1):
+            details = self._format_paper_details(paper, details_cache)
+            entry = f"## Paper {i}: {paper['citation_key']}\n{details}\n\n"
+            if token_budget is not None:
+                token_budget -= self._count_tokens(entry)
+                if token_budget < 0:
+                    break
+            buf.write(entry)
+        return buf.getvalue()
+
+    def _count_tokens(self, text: str) -> int:
+        """Count prompt tokens with tiktoken, or estimate at ~4 characters per token"""
+        if self._encoding is None and tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                print(f"Error loading tokenizer: {e}")
+                self._encoding = False
+        if not self._encoding:
+            return len(text) // 4 + 1
+        return len(self._encoding.encode(text))
+
+    def _format_paper_details(self, paper: Dict, cache: Dict[str, str]) -> str:
+        """Format a paper's details once per proposal and reuse them for every section"""
+        key = paper['citation_key']
+        details = cache.get(key)
+        if details is None:
+            details = _PAPER_DETAILS_TEMPLATE.format_map({
+                'title': paper['title'],
+                'authors': ', '.join(paper['authors'][:5]),
+                'year': paper['year'],
+                'abstract': paper['abstract'][:500],
+                'apa_citation': paper['apa_citation'],
+                'citation_key': key,
+            })
+            cache[key] = details
+        return details
+
+    def _group_templates_for_batch(
+        self,
+        templates: List[ProposalTemplate],
+        max_sections: int = 4
+    ) -> List[List[ProposalTemplate]]:
+        """Group consecutive templates whose combined maximum length fits in one completion"""
+        groups = []
+        current = []
+        budget = 0
+        for template in templates:
+            needed = self._batch_section_tokens(template)
+            if current and (len(current) >= max_sections or budget + needed > self.max_tokens):
+                groups.append(current)
+                current = []
+                budget = 0
+            current.append(template)
+            budget += needed
+        if current:
+            groups.append(current)
+        return groups
+
+    def _batch_section_tokens(self, template: ProposalTemplate) -> int:
+        """Completion tokens one section needs inside a batched JSON response"""
+        if not template.max_words:
+            # Unbounded sections take a whole completion, so they are never batched
+            return self.max_tokens
+        return _section_max_tokens(template.max_words) + _BATCH_JSON_OVERHEAD
+
+    def _generate_sections_batched(
+        self,
+        templates_group: List[ProposalTemplate],
+        title: str,
+        description: str,
+        research_context: str,
+        rag_context: RagContext,
+        user_requirements: Dict[str, Any] = None,
+        ignore_cache: bool = False
+    ) -> Dict[str, str]:
+        """
+        Generate several sections in one request with structured JSON output
+        Returns a dict of section name -> content; raises ValueError if the
+        response does not contain every requested section
+        """
+        # Select papers per section upfront and share them across the group
+        selected = {}
+        for template in templates_group:
+            for paper in self._select_relevant_papers(
+                section_name=template.section_name,
+                papers=rag_context.papers,
+                max_papers=self.max_papers,
+                section_description=template.description,
+                memo=rag_context.memo
+            ):
+                selected.setdefault(paper['citation_key'], paper)
+
+        section_names = [template.section_name for template in templates_group]
+        # Same citation rules and prefix as the per-section prompt, plus the JSON contract
+        system_prompt = (
+            self._build_system_prompt(templates_group[0].proposal_type.name) + _BATCH_OUTPUT_FORMAT
+        )
+
+        prompt_parts = [
+            "# Proposal Overview",
+            f"**Title:** {title}",
+            f"**Description:** {description}",
+            "",
+            research_context,
+            "",
+            "# Relevant Research Papers",
+            "Use ONLY these papers for citations:",
+            "",
+            self._format_paper_block(list(selected.values()), memo=rag_context.memo),
+            "# Your Task",
+        ]
+        for template in templates_group:
+            prompt_parts.append(
+                f"## {template.section_name} ({template.min_words} - {template.max_words} words)"
+            )
+            prompt_parts.append(template.prompt_template)
+            prompt_parts.append("")
 
-        # Additional requirements
         if user_requirements:
             prompt_parts.append("# Additional Requirements:")
             for key, value in user_requirements.items():
                 prompt_parts.append(f"- {key}: {value}")
             prompt_parts.append("")
 
-        # Final instructions
-        prompt_parts.append("# Final Instructions:")
-        prompt_parts.append("1. Write ONLY the section content, do not include a title")
-        prompt_parts.append("2. Cite papers using their citation keys")
-        prompt_parts.append("3. Ensure all claims are supported by the provided papers")
-        prompt_parts.append("4. Meet the word count requirements")
-        prompt_parts.append("5. Use professional academic language")
-        prompt_parts.append("")
-        prompt_parts.append("Begin writing now:")
+        prompt_parts.append(
+            "Return JSON: {" + ", ".join(f'"{name}": "..."' for name in section_names) + "}"
+        )
+        user_prompt = "\n".join(prompt_parts)
+
+        content = self._complete(
+            system_prompt,
+            user_prompt,
+            temperature=0.7,
+            ignore_cache=ignore_cache,
+            max_tokens=min(self.max_tokens, sum(map(self._batch_section_tokens, templates_group))),
+            response_format={"type": "json_object"}
+        )
 
-        return "\n".join(prompt_parts)
+        # A response cut off at max_tokens cannot parse; skip the attempt
+        if not _is_complete_json(content):
+            raise ValueError("Batched response was truncated")
+
+        sections = json.loads(content)
+        missing = [name for name in section_names if not isinstance(sections.get(name), str)]
+        if missing:
+            raise ValueError(f"Batched response missing sections: {', '.join(missing)}")
+        return {name: sections[name] for name in section_names}
 
     def _select_relevant_papers(
         self,
         section_name: str,
         papers: List[Dict],
-        max_papers: int = 30
+        max_papers: int = 30,
+        section_description: str = '',
+        memo: Dict[str, Any] = None
     ) -> List[Dict]:
-        """Select most relevant papers for a specific section"""
-
-        # Section-specific paper selection logic
-        section_keywords = {
-            'Introduction': ['background', 'context', 'motivation', 'problem'],
-            'Background': ['history', 'evolution', 'previous', 'existing'],
-            'Literature Review': ['review', 'survey', 'comparative', 'analysis'],
-            'Methodology': ['method', 'approach', 'technique', 'algorithm', 'framework'],
-            'Innovation': ['novel', 'new', 'innovative', 'breakthrough', 'advanced'],
-            'Impact': ['impact', 'benefit', 'application', 'deployment', 'real-world'],
-            'Work Plan': ['plan', 'timeline', 'schedule', 'milestone', 'deliverable'],
-        }
+        """
+        Select most relevant papers for a specific section
+        Candidates are recalled by embedding similarity when an embedding
+        model is configured, otherwise by keyword score. With a reranker
+        configured, the cross-encoder picks the final papers.
+        `memo` is the calling proposal's RagContext.memo, so paper texts and
+        embeddings are shared between its sections and never between proposals.
+        """
+        if memo is None:
+            memo = {}
+        query = f"{section_name} {section_description}"
+        limit = max(self.rerank_candidates, max_papers) if self.reranker_model else max_papers
+
+        candidates = None
+        if self.embedding_model:
+            candidates = self._select_by_embedding(query, papers, limit, memo)
+        if candidates is None:
+            candidates = self._select_by_keywords(section_name, papers, limit, memo)
+
+        if self.reranker_model:
+            reranked = self._rerank_papers(query, candidates, max_papers)
+            if reranked is not None:
+                return reranked
+
+        return candidates[:max_papers]
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts with OpenAI in concurrent batches, one row per text"""
+        batches = [texts[i:i + 256] for i in range(0, len(texts), 256)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            responses = list(executor.map(
+                lambda batch: self.client.embeddings.create(model=self.embedding_model, input=batch),
+                batches
+            ))
+        return np.array(
+            [item.embedding for response in responses for item in response.data],
+            dtype=np.float32
+        )
 
-        # Get keywords for this section
-        keywords = []
-        for key in section_keywords:
-            if key.lower() in section_name.lower():
-                keywords.extend(section_keywords[key])
+    def _embed_with_cache(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, calling OpenAI only for texts not already cached"""
+        keys = [
+            f"{self.embedding_model}:{hashlib.blake2b(text.encode(), digest_size=16).hexdigest()}"
+            for text in texts
+        ]
+        cached = {}
+        for key in set(keys):
+            vector = self.embedding_cache.get(key)
+            if vector is not None:
+                cached[key] = vector
+
+        misses = {key: text for key, text in zip(keys, texts) if key not in cached}
+        if misses:
+            vectors = self._embed(list(misses.values()))
+            for key, vector in zip(misses, vectors):
+                cached[key] = vector.tobytes()
+                self.embedding_cache[key] = cached[key]
+
+        return np.stack([np.frombuffer(cached[key], dtype=np.float32) for key in keys])
+
+    def _select_by_embedding(
+        self,
+        query: str,
+        papers: List[Dict],
+        limit: int,
+        memo: Dict[str, Any]
+    ) -> List[Dict]:
+        """Rank papers by cosine similarity to the query; returns None if embedding fails"""
+        if not papers:
+            return papers
 
-        if not keywords:
+        try:
+            paper_embeddings = memo.get('paper_embeddings')
+            if paper_embeddings is None:
+                paper_embeddings = memo['paper_embeddings'] = self._embed_with_cache([
+                    paper['title'] + ' ' + paper.get('abstract', '')[:500] for paper in papers
+                ])
+            query_embedding = self._embed_with_cache([query])[0]
+        except Exception as e:
+            print(f"Error embedding papers: {e}")
+            return None
+
+        # OpenAI embeddings are unit length, so one GEMV gives cosine similarity
+        scores = paper_embeddings @ query_embedding
+        top = np.argsort(-scores, kind='stable')[:limit]
+        return [papers[i] for i in top]
+
+    def _select_by_keywords(
+        self,
+        section_name: str,
+        papers: List[Dict],
+        max_papers: int,
+        memo: Dict[str, Any]
+    ) -> List[Dict]:
+        """Rank papers by prior relevance plus section keyword matches"""
+
+        # Get keyword matchers for this section
+        section_lower = section_name.lower()
+        matchers = [matcher for key, matcher in _SECTION_MATCHERS.items() if key in section_lower]
+
+        if not matchers:
             # No specific keywords, return top papers by relevance
             return papers[:max_papers]
 
-        # Score papers based on section relevance
-        scored_papers = []
-        for paper in papers:
-            score = paper.get('relevance_score', 0)
+        # Score papers based on section relevance, boosting for each distinct
+        # keyword found in the title or abstract
+        scores = [
+            paper.get('relevance_score', 0) + 2 * sum(len(matcher(text)) for matcher in matchers)
+            for paper, text in zip(papers, self._lowered_paper_texts(papers, memo))
+        ]
 
-            # Boost score if keywords appear in title or abstract
-            text = (paper['title'] + ' ' + paper.get('abstract', '')).lower()
-            keyword_matches = sum(1 for kw in keywords if kw in text)
-            score += keyword_matches * 2
+        # Partial selection of the top papers instead of a full sort
+        top = heapq.nlargest(max_papers, range(len(papers)), key=scores.__getitem__)
+        return [papers[i] for i in top]
 
-            scored_papers.append((score, paper))
+    def _rerank_papers(self, query: str, papers: List[Dict], max_papers: int) -> List[Dict]:
+        """Rerank papers with the cross-encoder; returns None if it is unavailable"""
+        if not papers:
+            return papers
 
-        # Sort by score and return top papers
-        scored_papers.sort(key=lambda x: x[0], reverse=True)
-        return [paper for score, paper in scored_papers[:max_papers]]
+        if self._reranker is None:
+            try:
+                from sentence_transformers import CrossEncoder
+                self._reranker = CrossEncoder(self.reranker_model)
+            except Exception as e:
+                # Don't retry loading for every section
+                print(f"Error loading reranker {self.reranker_model}: {e}")
+                self.reranker_model = None
+                return None
+
+        try:
+            scores = self._reranker.predict([
+                (query, paper['title'] + ' ' + paper.get('abstract', '')[:500])
+                for paper in papers
+            ])
+        except Exception as e:
+            print(f"Error reranking papers: {e}")
+            return None
+
+        top = heapq.nlargest(max_papers, range(len(papers)), key=lambda i: scores[i])
+        return [papers[i] for i in top]
+
+    def _lowered_paper_texts(self, papers: List[Dict], memo: Dict[str, Any]) -> List[str]:
+        """Lowercased title + abstract per paper, computed once per proposal"""
+        texts = memo.get('paper_text_lower')
+        if texts is None:
+            texts = memo['paper_text_lower'] = [
+                (paper['title'] + ' ' + paper.get('abstract', '')).lower()
+                for paper in papers
+            ]
+        return texts
 
     def _compile_proposal(self, metadata: Dict[str, Any]) -> str:
         """Compile all sections into complete proposal"""
-        parts = []
+        buf = io.StringIO()
+        w = buf.write
 
         # Title page
-        parts.append(f"# {metadata['title']}")
-        parts.append("")
-        parts.append(f"**Proposal Type:** {metadata['proposal_type']}")
-        parts.append(f"**Keywords:** {metadata['keywords']}")
-        parts.append("")
-        parts.append("---")
-        parts.append("")
+        w(
+            f"# {metadata['title']}\n\n"
+            f"**Proposal Type:** {metadata['proposal_type']}\n"
+            f"**Keywords:** {metadata['keywords']}\n\n---\n\n"
+        )
 
         # Executive Summary / Abstract
-        parts.append("## Executive Summary")
-        parts.append("")
-        parts.append(metadata['description'])
-        parts.append("")
-        parts.append("---")
-        parts.append("")
+        w(f"## Executive Summary\n\n{metadata['description']}\n\n---\n\n")
 
         # All sections
         for section in metadata['generated_sections']:
-            parts.append(f"## {section['name']}")
-            parts.append("")
-            parts.append(section['content'])
-            parts.append("")
-            parts.append("---")
-            parts.append("")
+            w(f"## {section['name']}\n\n{section['content']}\n\n---\n\n")
 
-        return "\n".join(parts)
+        return buf.getvalue()
 
     def generate_bibliography(self, rag_data: Dict[str, Any], format: str = 'apa') -> str:
-        """Generate formatted bibliography from RAG data"""
+        """Generate formatted bibliography from RAG data, using the prebuilt text when present"""
         if format == 'apa':
+            if 'bibliography_apa_text' in rag_data:
+                return rag_data['bibliography_apa_text']
             citations = rag_data.get('bibliography', {}).get('apa', [])
             return "\n\n".join(citations)
         elif format == 'bibtex':
+            if 'bibliography_bibtex_text' in rag_data:
+                return rag_data['bibliography_bibtex_text']
             citations = rag_data.get('bibliography', {}).get('bibtex', [])
             return "\n\n".join(citations)
         else:
@@ -419,11 +1077,12 @@ Remember: Quality over quantity. Every statement should add value to the proposa
         keywords: str,
         description: str,
         rag_data: Dict[str, Any],
-        user_requirements: Dict[str, Any] = None
-    ) -> Generator[str, None, None]:
+        user_requirements: Dict[str, Any] = None,
+        ignore_cache: bool = False
+    ) -> Generator[bytes, None, None]:
         """
         Stream proposal generation with real-time updates
-        Yields JSON strings for frontend consumption
+        Yields encoded SSE frames, ready for a StreamingHttpResponse
         """
         for update in self.generate_complete_proposal(
             proposal_type=proposal_type,
@@ -431,16 +1090,18 @@ Remember: Quality over quantity. Every statement should add value to the proposa
             keywords=keywords,
             description=description,
             rag_data=rag_data,
-            user_requirements=user_requirements
+            user_requirements=user_requirements,
+            ignore_cache=ignore_cache
         ):
-            yield f"data: {json.dumps(update)}\n\n"
+            yield _sse_frame(update)
 
     def enhance_existing_section(
         self,
         section_content: str,
         section_name: str,
         rag_data: Dict[str, Any],
-        enhancement_instructions: str = None
+        enhancement_instructions: str = None,
+        ignore_cache: bool = False
     ) -> str:
         """Enhance an existing section with better citations and content"""
 
@@ -467,27 +1128,25 @@ NEVER invent citations. Use ONLY the papers provided."""
 Provide the enhanced section:"""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
+            return self._complete(
+                system_prompt,
+                user_prompt,
                 temperature=0.6,
-                max_tokens=self.max_tokens
+                ignore_cache=ignore_cache
             )
 
-            return response.choices[0].message.content
-
         except Exception as e:
             raise Exception(f"Error enhancing section: {str(e)}")
 
     def _format_papers_for_enhancement(self, papers: List[Dict]) -> str:
         """Format papers for enhancement prompt"""
-        formatted = []
-        for paper in papers:
-            formatted.append(
-                f"- {paper['citation_key']}: {paper['title']} "
-                f"({', '.join(paper['authors'][:2])}, {paper['year']})"
-            )
-        return "\n".join(formatted)
+        return "\n".join(self._format_paper_short(paper) for paper in papers)
+
+    def _format_paper_short(self, paper: Dict) -> str:
+        """Format a one-line paper reference"""
+        return _PAPER_TEMPLATE.format_map({
+            'citation_key': paper['citation_key'],
+            'title': paper['title'],
+            'authors': ', '.join(paper['authors'][:2]),
+            'year': paper['year'],
+        })
@@ -2,13 +2,203 @@
 Enhanced RAG System for Grant Proposal Generation
 Collects comprehensive research data with perfect citations for AI generation
 """
+import copy
+import heapq
+import io
+import os
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
-from typing import List, Dict, Any, Tuple
+import numpy as np
+from typing import List, Dict, Any, Tuple, Callable
+from collections import Counter, OrderedDict, defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 import time
-from datetime import datetime
-import hashlib
+import threading
+import unicodedata
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+try:
+    import requests_cache
+except ImportError:  # optional: searches go to the network every time
+    requests_cache = None
+
+try:
+    import ahocorasick
+except ImportError:  # optional: falls back to a compiled regex
+    ahocorasick = None
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is requested
+    brotli = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # optional: falls back to the stdlib json module
+    _json_loads = json.loads
+
+try:
+    from lxml import etree
+except ImportError:  # optional: falls back to xml.etree.ElementTree
+    etree = None
+
+
+# Statuses the session adapter retries with backoff
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Compressed encodings urllib3 can decode here
+_ACCEPT_ENCODING = 'gzip, br' if brotli is not None else 'gzip'
+
+_ATOM_NS = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
+_ATOM_ENTRY_TAG = '{http://www.w3.org/2005/Atom}entry'
+
+if etree is not None:
+    # Plain (non-smart) strings so results don't keep cleared elements alive
+    _ARXIV_XPATHS = {
+        field: etree.XPath(path, namespaces=_ATOM_NS, smart_strings=False)
+        for field, path in {
+            'title': 'string(atom:title)',
+            'summary': 'string(atom:summary)',
+            'authors': 'atom:author/atom:name/text()',
+            'published': 'string(atom:published)',
+            'id': 'string(atom:id)',
+            'categories': 'atom:category/@term',
+            'doi': 'string(arxiv:doi)',
+        }.items()
+    }
+
+
+# Common research methodologies, matched case-insensitively
+_METHODOLOGY_KEYWORDS = (
+    'neural network', 'deep learning', 'machine learning', 'CNN', 'RNN', 'LSTM',
+    'transformer', 'GAN', 'reinforcement learning', 'supervised learning',
+    'unsupervised learning', 'semi-supervised', 'transfer learning',
+    'survey', 'experiment', 'case study', 'interview', 'ethnography',
+    'meta-analysis', 'systematic review', 'RCT', 'longitudinal study'
+)
+
+# Common datasets, matched case-sensitively
+_DATASET_KEYWORDS = (
+    'ImageNet', 'COCO', 'MNIST', 'CIFAR', 'Pascal VOC',
+    'FaceForensics', 'Celeb-DF', 'DFDC', 'DeepFake',
+    'SQuAD', 'GLUE', 'SuperGLUE', 'WikiText', 'BookCorpus',
+    'Common Crawl', 'LAION', 'OpenImages'
+)
+
+
+def _build_keyword_matcher(keywords, ignore_case: bool = False):
+    """
+    Return a function mapping text to the set of keywords it contains
+    Matches may overlap, as with a substring test per keyword. With
+    ignore_case the text is casefolded and the original keywords returned.
+    """
+    fold = str.casefold if ignore_case else (lambda text: text)
+    originals = {fold(keyword): keyword for keyword in keywords}
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for folded, keyword in originals.items():
+            automaton.add_word(folded, keyword)
+        automaton.make_automaton()
+        return lambda text: {keyword for _, keyword in automaton.iter(fold(text))}
+
+    # Zero-width lookahead so keywords inside longer matches are still found
+    pattern = re.compile('(?=(' + '|'.join(
+        re.escape(folded) for folded in sorted(originals, key=len, reverse=True)
+    ) + '))')
+    return lambda text: {originals[match] for match in pattern.findall(fold(text))}
+
+
+# Gap-indicating phrases, in reporting order
+_GAP_PHRASES = (
+    'however', 'limited', 'few studies', 'gap', 'challenge', 'open problem',
+    'future work', 'remains unclear', 'poorly understood', 'needs further'
+)
+
+_METHODOLOGY_MATCHER = _build_keyword_matcher(_METHODOLOGY_KEYWORDS, ignore_case=True)
+_DATASET_MATCHER = _build_keyword_matcher(_DATASET_KEYWORDS)
+_GAP_MATCHER = _build_keyword_matcher(_GAP_PHRASES)
+
+
+def _reconstruct_abstract(inverted_index: Dict[str, List[int]]) -> str:
+    """Rebuild an OpenAlex abstract from its inverted index by placing words at their positions"""
+    max_pos = max((pos for positions in inverted_index.values() for pos in positions), default=-1)
+    words = [''] * (max_pos + 1)
+    for word, positions in inverted_index.items():
+        for pos in positions:
+            words[pos] = word
+    return ' '.join(word for word in words if word)
+
+
+@dataclass
+class ResearchAggregates:
+    """Per-collection structures built in one pass over the top papers"""
+    themes: Dict[str, List[str]]
+    methodologies: List[str]
+    datasets: List[str]
+    timeline: Dict[str, int]
+    key_researchers: List[Dict[str, Any]]
+    apa: List[str]
+    bibtex: List[str]
+    apa_text: str
+    bibtex_text: str
+
+
+_BIBTEX_TEMPLATE = (
+    "@{entry_type}{{{citation_key},\n"
+    "  author = {{{author}}},\n"
+    "  title = {{{title}}},\n"
+    "  year = {{{year}}},\n"
+    "{extra_fields}}}"
+)
+
+# APA author list by author count; more than 20 authors are elided
+_APA_AUTHORS = {
+    0: lambda authors: "Unknown",
+    1: lambda authors: authors[0],
+    2: lambda authors: f"{authors[0]} & {authors[1]}",
+}
+
+
+def _apa_many_authors(authors: List[str]) -> str:
+    if len(authors) <= 20:
+        return ", ".join(authors[:-1]) + f", & {authors[-1]}"
+    return ", ".join(authors[:19]) + ", ... " + authors[-1]
+
+
+class TokenBucket:
+    """
+    Token bucket that spaces out requests to one source
+    Callers reserve a token under a lock and then sleep until it is due, so
+    concurrent callers are spaced out without holding the lock while waiting.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.ts = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.ts) * self.rate)
+            self.ts = now
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
 
 
 class EnhancedRAGSystem:
@@ -23,105 +213,237 @@ class EnhancedRAGSystem:
         self.crossref_base_url = "https://api.crossref.org/works"
         self.semantic_scholar_base_url = "https://api.semanticscholar.org/graph/v1/paper/search"
 
+        # Repeated searches are served from an on-disk HTTP cache for RAG_CACHE_TTL
+        # seconds, revalidating with ETag/Last-Modified; 0 disables caching
+        self.cache_ttl = int(os.getenv('RAG_CACHE_TTL', 24 * 3600))
+        self._search_cache = OrderedDict()
+        self._search_cache_size = 32
+        self._search_cache_lock = threading.Lock()
+
+        # Shared session so repeated calls to each host reuse pooled connections;
+        # pool_maxsize covers every comprehensive_search worker
+        if requests_cache is not None and self.cache_ttl:
+            self.session = requests_cache.CachedSession(
+                cache_name='.rag_cache',
+                backend='sqlite',
+                expire_after=timedelta(seconds=self.cache_ttl),
+                stale_if_error=True,
+                allowable_codes=(200,),
+                match_headers=['Accept']
+            )
+        else:
+            self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': 'GrantProposalGenerator/1.0 (mailto:research@example.com)',
+            'Accept-Encoding': _ACCEPT_ENCODING
+        })
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=5,
+                backoff_factor=0.4,
+                status_forcelist=list(_RETRY_STATUSES),
+                respect_retry_after_header=True,
+                allowed_methods=['GET']
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
         # Rate limiting
-        self.last_request_time = {}
         self.min_request_interval = {
             'arxiv': 3,  # 3 seconds between requests
             'openalex': 0.1,  # OpenAlex is more permissive
             'crossref': 0.05,
             'semantic_scholar': 1
         }
+        self.buckets = {
+            source: TokenBucket(rate=1 / interval)
+            for source, interval in self.min_request_interval.items()
+        }
+        self.limit_per_host = 4
+
+        # Cap on simultaneous outbound requests across all sources and pages
+        self.max_concurrent_requests = 8
+        self._global_sem = threading.BoundedSemaphore(self.max_concurrent_requests)
+        self.timeout = (5, 25)  # (connect, read) seconds
+
+        # Response format requested from each source
+        self.accept = {
+            'arxiv': 'application/atom+xml',
+            'openalex': 'application/json',
+            'semantic_scholar': 'application/json'
+        }
+
+        # Largest page each API serves; bigger searches fetch pages concurrently
+        self.page_size = {
+            'arxiv': 100,
+            'openalex': 200,
+            'semantic_scholar': 100
+        }
 
     def _rate_limit(self, source: str):
         """Implement rate limiting for API requests"""
-        if source in self.last_request_time:
-            elapsed = time.time() - self.last_request_time[source]
-            if elapsed < self.min_request_interval[source]:
-                time.sleep(self.min_request_interval[source] - elapsed)
-        self.last_request_time[source] = time.time()
+        self.buckets[source].acquire()
+
+    def _page_offsets(self, source: str, max_results: int) -> List[Tuple[int, int]]:
+        """(offset, page size) for each page needed to collect max_results"""
+        per_page = max(1, min(self.page_size[source], max_results))
+        return [(offset, per_page) for offset in range(0, max(max_results, 1), per_page)]
+
+    def _fetch_page(self, source: str, url: str, params: Dict[str, Any],
+                    parse: Callable, stream: bool = False) -> List[Dict]:
+        """GET one page of search results and parse it"""
+        with self._global_sem:
+            self._rate_limit(source)
+            response = self.session.get(
+                url, params=params, headers={'Accept': self.accept[source]},
+                stream=stream, timeout=self.timeout
+            )
+            with response:
+                response.raise_for_status()
+                if stream:
+                    response.raw.decode_content = True
+                    return parse(response.raw)
+                return parse(response.content)
+
+    def _fetch_pages(self, source: str, url: str, pages: List[Dict[str, Any]],
+                     parse: Callable, stream: bool = False) -> List[Dict]:
+        """Fetch pages concurrently and concatenate them in order; a failed page is skipped"""
+        def fetch(params):
+            try:
+                return self._fetch_page(source, url, params, parse, stream)
+            except Exception as e:
+                print(f"Error fetching {source} page: {e}")
+                return []
+
+        if len(pages) == 1:
+            return fetch(pages[0])
+
+        with ThreadPoolExecutor(max_workers=self.limit_per_host) as executor:
+            return [paper for page in executor.map(fetch, pages) for paper in page]
+
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _arxiv_pages(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                'search_query': f'all:{query}',
+                'start': start,
+                'max_results': per_page,
+                'sortBy': 'relevance',
+                'sortOrder': 'descending'
+            }
+            for start, per_page in self._page_offsets('arxiv', max_results)
+        ]
 
     def search_arxiv(self, query: str, max_results: int = 50) -> List[Dict]:
         """Search arXiv for academic papers"""
-        self._rate_limit('arxiv')
-
-        params = {
-            'search_query': f'all:{query}',
-            'start': 0,
-            'max_results': max_results,
-            'sortBy': 'relevance',
-            'sortOrder': 'descending'
-        }
-
         try:
-            response = requests.get(self.arxiv_base_url, params=params, timeout=30)
-            response.raise_for_status()
-
-            # Parse XML response
-            import xml.etree.ElementTree as ET
-            root = ET.fromstring(response.content)
-
-            papers = []
-            for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
-                try:
-                    paper = self._parse_arxiv_entry(entry)
-                    if paper:
-                        papers.append(paper)
-                except Exception as e:
-                    continue
-
-            return papers
+            return self._fetch_pages(
+                'arxiv', self.arxiv_base_url, self._arxiv_pages(query, max_results),
+                self._parse_arxiv_response, stream=True
+            )[:max_results]
         except Exception as e:
             print(f"Error searching arXiv: {e}")
             return []
 
-    def _parse_arxiv_entry(self, entry) -> Dict:
-        """Parse arXiv XML entry into structured data"""
-        try:
-            ns = {'atom': 'http://www.w3.org/2005/Atom', 'arxiv': 'http://arxiv.org/schemas/atom'}
+    def _parse_arxiv_response(self, content) -> List[Dict]:
+        """
+        Parse an arXiv Atom feed into structured papers
+        Accepts the body as bytes or a file-like stream. Entries are parsed
+        incrementally and cleared once read, so memory stays bounded per entry.
+        """
+        if isinstance(content, bytes):
+            content = io.BytesIO(content)
+
+        papers = []
+        for fields in self._iter_arxiv_entries(content):
+            try:
+                paper = self._parse_arxiv_entry(fields)
+                if paper:
+                    papers.append(paper)
+            except Exception as e:
+                continue
+
+        return papers
+
+    def _iter_arxiv_entries(self, stream):
+        """Yield raw fields for each feed entry, discarding parsed elements as we go"""
+        if etree is not None:
+            for _, entry in etree.iterparse(
+                stream, events=('end',), tag=_ATOM_ENTRY_TAG,
+                resolve_entities=False, huge_tree=False
+            ):
+                yield {field: xpath(entry) for field, xpath in _ARXIV_XPATHS.items()}
+                entry.clear()
+                while entry.getprevious() is not None:
+                    del entry.getparent()[0]
+        else:
+            for _, entry in ET.iterparse(stream, events=('end',)):
+                if entry.tag == _ATOM_ENTRY_TAG:
+                    yield self._arxiv_entry_fields(entry)
+                    entry.clear()
 
+    def _arxiv_entry_fields(self, entry) -> Dict[str, Any]:
+        """Extract raw arXiv entry fields with ElementTree, matching the lxml XPaths"""
+        def text(path):
+            elem = entry.find(path, _ATOM_NS)
+            return elem.text or '' if elem is not None else ''
+
+        return {
+            'title': text('atom:title'),
+            'summary': text('atom:summary'),
+            'authors': [
+                name.text for name in entry.findall('atom:author/atom:name', _ATOM_NS) if name.text
+            ],
+            'published': text('atom:published'),
+            'id': text('atom:id'),
+            'categories': [
+                category.get('term') for category in entry.findall('atom:category', _ATOM_NS)
+                if category.get('term')
+            ],
+            'doi': text('arxiv:doi'),
+        }
+
+    def _parse_arxiv_entry(self, fields: Dict[str, Any]) -> Dict:
+        """Parse raw arXiv entry fields into structured data"""
+        try:
             # Safely extract title
-            title_elem = entry.find('atom:title', ns)
-            if title_elem is None or not title_elem.text:
+            if not fields['title']:
                 return None
-            title = title_elem.text.strip().replace('\n', ' ')
+            title = fields['title'].strip().replace('\n', ' ')
 
             # Safely extract summary
-            summary_elem = entry.find('atom:summary', ns)
-            summary = summary_elem.text.strip().replace('\n', ' ') if summary_elem is not None and summary_elem.text else ''
+            summary = fields['summary'].strip().replace('\n', ' ')
 
             # Authors
-            authors = []
-            for author in entry.findall('atom:author', ns):
-                name_elem = author.find('atom:name', ns)
-                if name_elem is not None and name_elem.text:
-                    authors.append(name_elem.text.strip())
+            authors = [name.strip() for name in fields['authors']]
 
             # Publication date
-            published_elem = entry.find('atom:published', ns)
-            if published_elem is None or not published_elem.text:
-                year = '2024'
-            else:
-                year = published_elem.text.strip().split('-')[0]
+            published = fields['published'].strip()
+            year = published.split('-')[0] if published else '2024'
 
             # arXiv ID and URL
-            id_elem = entry.find('atom:id', ns)
-            if id_elem is None or not id_elem.text:
+            if not fields['id']:
                 return None
-            arxiv_id = id_elem.text.strip().split('/abs/')[-1]
-            url = id_elem.text.strip()
+            url = fields['id'].strip()
+            arxiv_id = url.split('/abs/')[-1]
 
             # Categories
-            categories = []
-            for category in entry.findall('atom:category', ns):
-                term = category.get('term')
-                if term:
-                    categories.append(term)
+            categories = [str(term) for term in fields['categories']]
 
             # DOI if available
-            doi = None
-            doi_elem = entry.find('arxiv:doi', ns)
-            if doi_elem is not None and doi_elem.text:
-                doi = doi_elem.text.strip()
+            doi = fields['doi'].strip() or None
 
             return {
                 'source': 'arXiv',
@@ -133,48 +455,50 @@ class EnhancedRAGSystem:
                 'url': url,
                 'doi': doi,
                 'categories': categories,
-                'citation_key': self._generate_citation_key(authors, year, title),
-                'apa_citation': self._format_apa_citation(authors, year, title, url, doi),
-                'bibtex': self._generate_bibtex(authors, year, title, arxiv_id, doi)
+                **self._citation_fields(authors, year, title, url, doi, arxiv_id=arxiv_id)
             }
         except Exception as e:
             print(f"Error parsing arXiv entry: {e}")
             return None
 
+    def _openalex_pages(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                'search': query,
+                'per_page': per_page,
+                'page': offset // per_page + 1,
+                'sort': 'relevance_score:desc',
+                'filter': 'is_paratext:false'  # Exclude non-research works
+            }
+            for offset, per_page in self._page_offsets('openalex', max_results)
+        ]
+
     def search_openalex(self, query: str, max_results: int = 50) -> List[Dict]:
         """Search OpenAlex for academic papers"""
-        self._rate_limit('openalex')
-
-        params = {
-            'search': query,
-            'per_page': max_results,
-            'sort': 'relevance_score:desc',
-            'filter': 'is_paratext:false'  # Exclude non-research works
-        }
-
-        headers = {
-            'User-Agent': 'GrantProposalGenerator/1.0 (mailto:research@example.com)'
-        }
-
         try:
-            response = requests.get(self.openalex_base_url, params=params, headers=headers, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            papers = []
-            for result in data.get('results', []):
-                try:
-                    paper = self._parse_openalex_result(result)
-                    if paper:
-                        papers.append(paper)
-                except Exception as e:
-                    continue
-
-            return papers
+            return self._fetch_pages(
+                'openalex', self.openalex_base_url, self._openalex_pages(query, max_results),
+                self._parse_openalex_response
+            )[:max_results]
         except Exception as e:
             print(f"Error searching OpenAlex: {e}")
             return []
 
+    def _parse_openalex_response(self, content: bytes) -> List[Dict]:
+        """Parse an OpenAlex works response into structured papers"""
+        data = _json_loads(content)
+
+        papers = []
+        for result in data.get('results', []):
+            try:
+                paper = self._parse_openalex_result(result)
+                if paper:
+                    papers.append(paper)
+            except Exception as e:
+                continue
+
+        return papers
+
     def _parse_openalex_result(self, result: Dict) -> Dict:
         """Parse OpenAlex result into structured data"""
         try:
@@ -198,14 +522,7 @@ class EnhancedRAGSystem:
             # Abstract
             abstract = ''
             if result.get('abstract_inverted_index'):
-                # Reconstruct abstract from inverted index
-                inverted_index = result['abstract_inverted_index']
-                word_positions = []
-                for word, positions in inverted_index.items():
-                    for pos in positions:
-                        word_positions.append((pos, word))
-                word_positions.sort()
-                abstract = ' '.join([word for _, word in word_positions])
+                abstract = _reconstruct_abstract(result['abstract_inverted_index'])
 
             # DOI
             doi = result.get('doi', '').replace('https://doi.org/', '') if result.get('doi') else None
@@ -230,43 +547,50 @@ class EnhancedRAGSystem:
                 'doi': doi,
                 'cited_by_count': cited_by_count,
                 'concepts': concepts,
-                'citation_key': self._generate_citation_key(authors, year, title),
-                'apa_citation': self._format_apa_citation(authors, year, title, url, doi),
-                'bibtex': self._generate_bibtex(authors, year, title, doi=doi)
+                **self._citation_fields(authors, year, title, url, doi)
             }
         except Exception as e:
             print(f"Error parsing OpenAlex result: {e}")
             return None
 
+    def _semantic_scholar_pages(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        return [
+            {
+                'query': query,
+                'offset': offset,
+                'limit': per_page,
+                'fields': 'title,authors,year,abstract,citationCount,url,externalIds,publicationTypes,influentialCitationCount'
+            }
+            for offset, per_page in self._page_offsets('semantic_scholar', max_results)
+        ]
+
     def search_semantic_scholar(self, query: str, max_results: int = 50) -> List[Dict]:
         """Search Semantic Scholar for academic papers"""
-        self._rate_limit('semantic_scholar')
-
-        params = {
-            'query': query,
-            'limit': max_results,
-            'fields': 'title,authors,year,abstract,citationCount,url,externalIds,publicationTypes,influentialCitationCount'
-        }
-
         try:
-            response = requests.get(self.semantic_scholar_base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            papers = []
-            for result in data.get('data', []):
-                try:
-                    paper = self._parse_semantic_scholar_result(result)
-                    if paper:
-                        papers.append(paper)
-                except Exception as e:
-                    continue
-
-            return papers
+            return self._fetch_pages(
+                'semantic_scholar', self.semantic_scholar_base_url,
+                self._semantic_scholar_pages(query, max_results),
+                self._parse_semantic_scholar_response
+            )[:max_results]
         except Exception as e:
             print(f"Error searching Semantic Scholar: {e}")
             return []
 
+    def _parse_semantic_scholar_response(self, content: bytes) -> List[Dict]:
+        """Parse a Semantic Scholar search response into structured papers"""
+        data = _json_loads(content)
+
+        papers = []
+        for result in data.get('data', []):
+            try:
+                paper = self._parse_semantic_scholar_result(result)
+                if paper:
+                    papers.append(paper)
+            except Exception as e:
+                continue
+
+        return papers
+
     def _parse_semantic_scholar_result(self, result: Dict) -> Dict:
         """Parse Semantic Scholar result into structured data"""
         title = result.get('title', 'Untitled')
@@ -304,19 +628,57 @@ class EnhancedRAGSystem:
             'arxiv_id': arxiv_id,
             'citation_count': citation_count,
             'influential_citation_count': influential_citation_count,
-            'citation_key': self._generate_citation_key(authors, year, title),
-            'apa_citation': self._format_apa_citation(authors, year, title, url, doi),
-            'bibtex': self._generate_bibtex(authors, year, title, doi=doi, arxiv_id=arxiv_id)
+            **self._citation_fields(authors, year, title, url, doi, arxiv_id=arxiv_id)
         }
 
     def comprehensive_search(self, query: str, max_results_per_source: int = 50) -> Dict[str, Any]:
         """
         Perform comprehensive search across all sources in parallel
-        Returns structured data ready for AI generation
+        Returns structured data ready for AI generation; identical searches
+        within the cache TTL return a copy of the previous result
         """
+        key = (query, max_results_per_source)
+        with self._search_cache_lock:
+            cached = self._search_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+                self._search_cache.move_to_end(key)
+            else:
+                cached = None
+        if cached is not None:
+            return copy.deepcopy(cached[1])
+
+        structured_data = self._comprehensive_search(query, max_results_per_source)
+
+        if self.cache_ttl:
+            entry = (time.monotonic(), copy.deepcopy(structured_data))
+            with self._search_cache_lock:
+                self._search_cache[key] = entry
+                if len(self._search_cache) > self._search_cache_size:
+                    self._search_cache.popitem(last=False)
+
+        return structured_data
+
+    def _comprehensive_search(self, query: str, max_results_per_source: int) -> Dict[str, Any]:
+        """Search, deduplicate, rank and structure papers from all sources"""
         print(f"🔍 Starting comprehensive search for: {query}")
 
-        # Parallel search across all sources
+        # Concurrent search across all sources
+        results = self._search_threaded(query, max_results_per_source)
+
+        # Combine and deduplicate
+        all_papers = self._combine_and_deduplicate(results)
+        print(f"📚 Total unique papers after deduplication: {len(all_papers)}")
+
+        # Rank by relevance and quality
+        ranked_papers = self._rank_papers(all_papers, query)
+
+        # Extract key information
+        structured_data = self._structure_research_data(ranked_papers, query)
+
+        return structured_data
+
+    def _search_threaded(self, query: str, max_results_per_source: int) -> Dict[str, List[Dict]]:
+        """Search all sources in a thread pool"""
         with ThreadPoolExecutor(max_workers=4) as executor:
             futures = {
                 executor.submit(self.search_arxiv, query, max_results_per_source): 'arxiv',
@@ -335,57 +697,47 @@ class EnhancedRAGSystem:
                     print(f"✗ Error retrieving from {source}: {e}")
                     results[source] = []
 
-        # Combine and deduplicate
-        all_papers = self._combine_and_deduplicate(results)
-        print(f"📚 Total unique papers after deduplication: {len(all_papers)}")
-
-        # Rank by relevance and quality
-        ranked_papers = self._rank_papers(all_papers, query)
-
-        # Extract key information
-        structured_data = self._structure_research_data(ranked_papers, query)
-
-        return structured_data
+        return results
 
     def _combine_and_deduplicate(self, results: Dict[str, List[Dict]]) -> List[Dict]:
-        """Combine papers from different sources and remove duplicates"""
-        seen_titles = set()
-        seen_dois = set()
+        """
+        Combine papers from different sources and remove duplicates
+        Papers match on DOI or normalized title; of two matching papers the
+        one with more citations is kept, in the position of the first.
+        """
         unique_papers = []
+        index_by_doi = {}
+        index_by_title = {}
 
-        # Flatten all papers
-        all_papers = []
-        for source, papers in results.items():
-            all_papers.extend(papers)
-
-        for paper in all_papers:
-            # Skip None papers
-            if paper is None:
-                continue
-
-            # Skip papers without title
-            if not paper.get('title'):
-                continue
+        for papers in results.values():
+            for paper in papers:
+                # Skip None papers and papers without title
+                if not paper or not paper.get('title'):
+                    continue
 
-            title_normalized = paper['title'].lower().strip()
-            doi = paper.get('doi', '').strip() if paper.get('doi') else ''
+                title_key = unicodedata.normalize('NFKC', paper['title']).casefold().strip()
+                doi = paper['doi'].strip() if paper.get('doi') else ''
 
-            # Check for duplicates
-            is_duplicate = False
+                index = index_by_doi.get(doi) if doi else None
+                if index is None:
+                    index = index_by_title.get(title_key)
 
-            if doi and doi in seen_dois:
-                is_duplicate = True
-            elif title_normalized in seen_titles:
-                is_duplicate = True
+                if index is None:
+                    index = len(unique_papers)
+                    unique_papers.append(paper)
+                elif self._citation_count(paper) > self._citation_count(unique_papers[index]):
+                    unique_papers[index] = paper
 
-            if not is_duplicate:
-                unique_papers.append(paper)
-                seen_titles.add(title_normalized)
+                index_by_title.setdefault(title_key, index)
                 if doi:
-                    seen_dois.add(doi)
+                    index_by_doi.setdefault(doi, index)
 
         return unique_papers
 
+    @staticmethod
+    def _citation_count(paper: Dict) -> int:
+        return paper.get('cited_by_count', paper.get('citation_count', 0)) or 0
+
     def _rank_papers(self, papers: List[Dict], query: str) -> List[Dict]:
         """Rank papers by relevance and quality"""
         # Simple ranking based on:
@@ -393,42 +745,47 @@ class EnhancedRAGSystem:
         # 2. Citation count (if available)
         # 3. Recency
 
-        query_terms = set(query.lower().split())
-
-        for paper in papers:
-            score = 0
-
-            # Relevance score based on query terms
-            title_terms = set(paper['title'].lower().split())
-            abstract_terms = set(paper['abstract'].lower().split()) if paper['abstract'] else set()
-
-            title_overlap = len(query_terms & title_terms)
-            abstract_overlap = len(query_terms & abstract_terms)
+        if not papers:
+            return papers
 
-            score += title_overlap * 10  # Title matches weighted more
-            score += abstract_overlap * 2
+        query_terms = set(query.lower().split())
+        current_year = datetime.now().year
 
-            # Citation count (normalize)
-            citation_count = paper.get('cited_by_count', paper.get('citation_count', 0))
-            score += min(citation_count / 100, 10)  # Cap at 10 points
+        # Relevance based on query terms; intersecting with the token iterator
+        # avoids building a set per title and abstract
+        title_overlap = np.fromiter(
+            (len(query_terms.intersection(paper['title'].lower().split())) for paper in papers),
+            dtype=np.float64, count=len(papers)
+        )
+        abstract_overlap = np.fromiter(
+            (len(query_terms.intersection((paper['abstract'] or '').lower().split())) for paper in papers),
+            dtype=np.float64, count=len(papers)
+        )
+        citations = np.fromiter(
+            (self._citation_count(paper) for paper in papers), dtype=np.float64, count=len(papers)
+        )
+        years = np.fromiter(
+            (int(paper['year']) if paper['year'].isdigit() else 0 for paper in papers),
+            dtype=np.int64, count=len(papers)
+        )
 
-            # Recency (more recent is better)
-            try:
-                year = int(paper['year'])
-                current_year = datetime.now().year
-                if year >= current_year - 3:
-                    score += 5
-                elif year >= current_year - 5:
-                    score += 3
-                elif year >= current_year - 10:
-                    score += 1
-            except:
-                pass
+        scores = (
+            title_overlap * 10  # Title matches weighted more
+            + abstract_overlap * 2
+            + np.minimum(citations / 100, 10)  # Cap at 10 points
+            + np.select(  # Recency (more recent is better)
+                [years >= current_year - 3, years >= current_year - 5, years >= current_year - 10],
+                [5, 3, 1],
+                default=0
+            )
+        )
 
+        for paper, score in zip(papers, scores.tolist()):
             paper['relevance_score'] = score
 
-        # Sort by relevance score
-        papers.sort(key=lambda x: x.get('relevance_score', 0), reverse=True)
+        # Sort by relevance score, keeping source order for ties
+        order = np.argsort(-scores, kind='stable')
+        papers[:] = [papers[i] for i in order]
 
         return papers
 
@@ -438,14 +795,9 @@ class EnhancedRAGSystem:
         # Take top papers
         top_papers = papers[:100]  # Use top 100 papers
 
-        # Organize by themes/topics (simple clustering by shared terms)
-        themes = self._extract_themes(top_papers)
-
-        # Extract methodologies
-        methodologies = self._extract_methodologies(top_papers)
-
-        # Extract datasets mentioned
-        datasets = self._extract_datasets(top_papers)
+        # Themes, methodologies, datasets, timeline, researchers and bibliography
+        aggregates = self._aggregate_top_papers(top_papers)
+        themes = aggregates.themes
 
         # Create citation library
         citation_library = {paper['citation_key']: paper for paper in top_papers}
@@ -464,142 +816,137 @@ class EnhancedRAGSystem:
 
             # Structured insights
             'themes': themes,
-            'methodologies': methodologies,
-            'datasets': datasets,
+            'methodologies': aggregates.methodologies,
+            'datasets': aggregates.datasets,
 
             # Bibliography in multiple formats
             'bibliography': {
-                'apa': [paper['apa_citation'] for paper in top_papers],
-                'bibtex': [paper['bibtex'] for paper in top_papers],
+                'apa': aggregates.apa,
+                'bibtex': aggregates.bibtex,
             },
+            'bibliography_apa_text': aggregates.apa_text,
+            'bibliography_bibtex_text': aggregates.bibtex_text,
 
             # Research gaps and opportunities
             'research_gaps': self._identify_research_gaps(top_papers, themes),
 
             # Timeline of research
-            'timeline': self._create_research_timeline(top_papers),
+            'timeline': aggregates.timeline,
 
             # Key researchers
-            'key_researchers': self._identify_key_researchers(top_papers),
+            'key_researchers': aggregates.key_researchers,
         }
 
         return structured_data
 
-    def _extract_themes(self, papers: List[Dict]) -> Dict[str, List[str]]:
-        """Extract major themes from papers"""
-        themes = {}
-
-        # Use concepts/categories from papers
-        for paper in papers:
-            concepts = paper.get('concepts', paper.get('categories', []))
-            for concept in concepts:
-                if concept not in themes:
-                    themes[concept] = []
-                themes[concept].append(paper['citation_key'])
-
-        # Sort by frequency
-        sorted_themes = {k: v for k, v in sorted(themes.items(), key=lambda x: len(x[1]), reverse=True)}
-
-        return sorted_themes
-
-    def _extract_methodologies(self, papers: List[Dict]) -> List[str]:
-        """Extract methodologies mentioned in papers"""
-        # Common research methodologies
-        methodology_keywords = [
-            'neural network', 'deep learning', 'machine learning', 'CNN', 'RNN', 'LSTM',
-            'transformer', 'GAN', 'reinforcement learning', 'supervised learning',
-            'unsupervised learning', 'semi-supervised', 'transfer learning',
-            'survey', 'experiment', 'case study', 'interview', 'ethnography',
-            'meta-analysis', 'systematic review', 'RCT', 'longitudinal study'
-        ]
+    def _aggregate_top_papers(self, papers: List[Dict]) -> ResearchAggregates:
+        """Extract themes, methodologies, datasets, timeline, researchers and bibliography in one pass"""
+        themes = defaultdict(dict)  # concept -> citation keys, as an ordered set
+        methodologies = set()
+        datasets = set()
+        timeline = {}
+        paper_counts = Counter()
+        total_citations = Counter()
+        papers_by_author = defaultdict(list)
+        apa = []
+        bibtex = []
+        apa_text = io.StringIO()
+        bibtex_text = io.StringIO()
+
+        for index, paper in enumerate(papers):
+            citation_key = paper['citation_key']
+
+            # Themes from concepts/categories, counting each paper once per concept
+            for concept in paper.get('concepts', paper.get('categories', [])):
+                if concept:
+                    themes[concept][citation_key] = None
+
+            # Methodologies and datasets mentioned
+            text = paper['title'] + ' ' + paper['abstract']
+            methodologies |= _METHODOLOGY_MATCHER(text)
+            datasets |= _DATASET_MATCHER(text)
+
+            # Timeline by year
+            year = paper['year']
+            if year != 'n.d.':
+                timeline[year] = timeline.get(year, 0) + 1
 
-        found_methodologies = set()
-        for paper in papers:
-            text = (paper['title'] + ' ' + paper['abstract']).lower()
-            for methodology in methodology_keywords:
-                if methodology.lower() in text:
-                    found_methodologies.add(methodology)
-
-        return list(found_methodologies)
-
-    def _extract_datasets(self, papers: List[Dict]) -> List[str]:
-        """Extract datasets mentioned in papers"""
-        # Common datasets
-        dataset_keywords = [
-            'ImageNet', 'COCO', 'MNIST', 'CIFAR', 'Pascal VOC',
-            'FaceForensics', 'Celeb-DF', 'DFDC', 'DeepFake',
-            'SQuAD', 'GLUE', 'SuperGLUE', 'WikiText', 'BookCorpus',
-            'Common Crawl', 'LAION', 'OpenImages'
+            # Authorship and citations
+            citation_count = self._citation_count(paper)
+            for author in paper['authors']:
+                paper_counts[author] += 1
+                total_citations[author] += citation_count
+                papers_by_author[author].append(citation_key)
+
+            # Bibliography as lists and as ready-to-use text
+            apa.append(paper['apa_citation'])
+            bibtex.append(paper['bibtex'])
+            if index:
+                apa_text.write("\n\n")
+                bibtex_text.write("\n\n")
+            apa_text.write(paper['apa_citation'])
+            bibtex_text.write(paper['bibtex'])
+
+        # Sort themes by frequency and researchers by paper count and citations
+        sorted_themes = {
+            k: list(v) for k, v in sorted(themes.items(), key=lambda x: len(x[1]), reverse=True)
+        }
+        top_authors = heapq.nlargest(  # Top 20 researchers
+            20, paper_counts, key=lambda author: (paper_counts[author], total_citations[author])
+        )
+        key_researchers = [
+            {
+                'name': author,
+                'paper_count': paper_counts[author],
+                'total_citations': total_citations[author],
+                'papers': papers_by_author[author]
+            }
+            for author in top_authors
         ]
 
-        found_datasets = set()
-        for paper in papers:
-            text = (paper['title'] + ' ' + paper['abstract'])
-            for dataset in dataset_keywords:
-                if dataset in text:
-                    found_datasets.add(dataset)
-
-        return list(found_datasets)
+        return ResearchAggregates(
+            themes=sorted_themes,
+            methodologies=list(methodologies),
+            datasets=list(datasets),
+            timeline=dict(sorted(timeline.items())),
+            key_researchers=key_researchers,
+            apa=apa,
+            bibtex=bibtex,
+            apa_text=apa_text.getvalue(),
+            bibtex_text=bibtex_text.getvalue()
+        )
 
     def _identify_research_gaps(self, papers: List[Dict], themes: Dict) -> List[str]:
-        """Identify potential research gaps"""
+        """
+        Identify potential research gaps
+        One matcher pass finds the gap phrases in each abstract; the sentence
+        around each phrase's first occurrence is sliced out without splitting.
+        """
         gaps = []
 
-        # Analyze abstracts for gap-indicating phrases
-        gap_phrases = [
-            'however', 'limited', 'few studies', 'gap', 'challenge', 'open problem',
-            'future work', 'remains unclear', 'poorly understood', 'needs further'
-        ]
-
         for paper in papers[:20]:  # Check top 20 papers
             abstract = paper['abstract'].lower()
-            for phrase in gap_phrases:
-                if phrase in abstract:
+            found = _GAP_MATCHER(abstract)
+            for phrase in _GAP_PHRASES:
+                if phrase in found:
                     # Extract sentence containing the phrase
-                    sentences = abstract.split('.')
-                    for sentence in sentences:
-                        if phrase in sentence:
-                            gaps.append(sentence.strip())
-                            break
+                    start = abstract.index(phrase)
+                    end = abstract.find('.', start)
+                    gaps.append(abstract[abstract.rfind('.', 0, start) + 1:end if end != -1 else None].strip())
+                    if len(gaps) >= 10:
+                        return gaps  # Return top 10 gaps
 
-        return gaps[:10]  # Return top 10 gaps
+        return gaps
 
-    def _create_research_timeline(self, papers: List[Dict]) -> Dict[str, int]:
-        """Create timeline of research by year"""
-        timeline = {}
-        for paper in papers:
-            year = paper['year']
-            if year != 'n.d.':
-                timeline[year] = timeline.get(year, 0) + 1
-
-        return dict(sorted(timeline.items()))
-
-    def _identify_key_researchers(self, papers: List[Dict]) -> List[Dict[str, Any]]:
-        """Identify key researchers based on authorship and citations"""
-        author_stats = {}
-
-        for paper in papers:
-            citation_count = paper.get('cited_by_count', paper.get('citation_count', 0))
-            for author in paper['authors']:
-                if author not in author_stats:
-                    author_stats[author] = {
-                        'name': author,
-                        'paper_count': 0,
-                        'total_citations': 0,
-                        'papers': []
-                    }
-                author_stats[author]['paper_count'] += 1
-                author_stats[author]['total_citations'] += citation_count
-                author_stats[author]['papers'].append(paper['citation_key'])
-
-        # Sort by paper count and citations
-        key_researchers = sorted(
-            author_stats.values(),
-            key=lambda x: (x['paper_count'], x['total_citations']),
-            reverse=True
-        )
-
-        return key_researchers[:20]  # Top 20 researchers
+    def _citation_fields(self, authors: List[str], year: str, title: str, url: str,
+                         doi: str = None, arxiv_id: str = None) -> Dict[str, str]:
+        """Citation key, APA citation and BibTeX for a paper, sharing one citation key"""
+        citation_key = self._generate_citation_key(authors, year, title)
+        return {
+            'citation_key': citation_key,
+            'apa_citation': self._format_apa_citation(authors, year, title, url, doi),
+            'bibtex': self._generate_bibtex(authors, year, title, arxiv_id, doi, citation_key=citation_key)
+        }
 
     def _generate_citation_key(self, authors: List[str], year: str, title: str) -> str:
         """Generate unique citation key"""
@@ -617,16 +964,7 @@ class EnhancedRAGSystem:
     def _format_apa_citation(self, authors: List[str], year: str, title: str, url: str, doi: str = None) -> str:
         """Format citation in APA style"""
         # Format authors
-        if not authors:
-            author_str = "Unknown"
-        elif len(authors) == 1:
-            author_str = authors[0]
-        elif len(authors) == 2:
-            author_str = f"{authors[0]} & {authors[1]}"
-        elif len(authors) <= 20:
-            author_str = ", ".join(authors[:-1]) + f", & {authors[-1]}"
-        else:
-            author_str = ", ".join(authors[:19]) + ", ... " + authors[-1]
+        author_str = _APA_AUTHORS.get(len(authors), _apa_many_authors)(authors)
 
         # Build citation
         citation = f"{author_str} ({year}). {title}."
@@ -639,29 +977,24 @@ class EnhancedRAGSystem:
         return citation
 
     def _generate_bibtex(self, authors: List[str], year: str, title: str,
-                         arxiv_id: str = None, doi: str = None) -> str:
+                         arxiv_id: str = None, doi: str = None, citation_key: str = None) -> str:
         """Generate BibTeX entry"""
         # Create citation key
-        citation_key = self._generate_citation_key(authors, year, title)
-
-        # Format authors for BibTeX
-        author_str = " and ".join(authors) if authors else "Unknown"
+        if citation_key is None:
+            citation_key = self._generate_citation_key(authors, year, title)
 
-        # Determine entry type
+        # arXiv and DOI fields
+        extra_fields = ""
         if arxiv_id:
-            entry_type = "article"
             extra_fields = f"  eprint = {{{arxiv_id}}},\n  archivePrefix = {{arXiv}},\n"
-        else:
-            entry_type = "article"
-            extra_fields = ""
-
         if doi:
             extra_fields += f"  doi = {{{doi}}},\n"
 
-        bibtex = f"""@{entry_type}{{{citation_key},
-  author = {{{author_str}}},
-  title = {{{title}}},
-  year = {{{year}}},
-{extra_fields}}}"""
-
-        return bibtex
+        return _BIBTEX_TEMPLATE.format_map({
+            'entry_type': "article",
+            'citation_key': citation_key,
+            'author': " and ".join(authors) if authors else "Unknown",
+            'title': title,
+            'year': year,
+            'extra_fields': extra_fields,
+        })
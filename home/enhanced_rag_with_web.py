@@ -2,10 +2,80 @@
 Enhanced RAG System with Web Scraping
 Combines API searches with web scraping for comprehensive research
 """
-from .enhanced_rag_system import EnhancedRAGSystem
+from .enhanced_rag_system import EnhancedRAGSystem, _build_keyword_matcher
 from .web_scraper import WebScraperSystem
 from typing import Dict, List, Any
-import time
+import hashlib
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # optional: falls back to exact normalized-title matching
+    MinHash = MinHashLSH = None
+
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Methodologies (any case) and datasets (exact case) counted over merged abstracts
+_METHODOLOGY_KEYWORDS = (
+    'machine learning', 'deep learning', 'neural network', 'CNN', 'RNN',
+    'transformer', 'BERT', 'GPT', 'regression', 'classification',
+    'clustering', 'reinforcement learning', 'supervised', 'unsupervised',
+    'survey', 'experimental', 'simulation', 'statistical analysis'
+)
+_DATASET_KEYWORDS = (
+    'ImageNet', 'COCO', 'MNIST', 'CIFAR', 'VOC', 'CelebA',
+    'WikiText', 'SQuAD', 'GLUE', 'SuperGLUE', 'CommonCrawl'
+)
+
+_METHODOLOGY_MATCHER = _build_keyword_matcher(_METHODOLOGY_KEYWORDS, ignore_case=True)
+_DATASET_MATCHER = _build_keyword_matcher(_DATASET_KEYWORDS)
+_KEYWORD_ORDER = {
+    keyword: index for index, keyword in enumerate(_METHODOLOGY_KEYWORDS + _DATASET_KEYWORDS)
+}
+
+
+class _TitleIndex:
+    """
+    Near-duplicate detector for paper titles
+    Exact repeats are caught by an MD5 of (title, DOI) first; only new
+    keys reach MinHash LSH over character 3-gram shingles, which catches
+    variants such as "A Survey of X" / "A survey of X.".
+    """
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, fuzzy: bool = True):
+        self.num_perm = num_perm
+        self.lsh = MinHashLSH(threshold=threshold, num_perm=num_perm) if MinHashLSH and fuzzy else None
+        self.seen = set()
+        self.seen_md5 = set()
+
+    def add(self, title: str, doi: str = '') -> bool:
+        """Index a title; returns False if it duplicates one already indexed"""
+        lowered = title.lower()
+        key = hashlib.md5(f"{lowered.strip()}|{doi}".encode('utf-8')).digest()
+        if key in self.seen_md5:
+            return False
+        self.seen_md5.add(key)
+
+        normalized = _NON_ALNUM.sub(' ', lowered).strip()
+
+        if self.lsh is None:
+            if normalized in self.seen:
+                return False
+            self.seen.add(normalized)
+            return True
+
+        shingles = {normalized[i:i + 3] for i in range(max(len(normalized) - 2, 1))}
+        minhash = MinHash(num_perm=self.num_perm)
+        minhash.update_batch([shingle.encode('utf-8') for shingle in shingles])
+
+        if self.lsh.query(minhash):
+            return False
+        self.lsh.insert(str(len(self.seen)), minhash)
+        self.seen.add(normalized)
+        return True
 
 
 class EnhancedRAGWithWeb(EnhancedRAGSystem):
@@ -20,6 +90,7 @@ class EnhancedRAGWithWeb(EnhancedRAGSystem):
     def __init__(self):
         super().__init__()
         self.web_scraper = WebScraperSystem()
+        self.max_concurrent_scrapes = 5
 
     def comprehensive_search_with_web(
         self,
@@ -30,35 +101,69 @@ class EnhancedRAGWithWeb(EnhancedRAGSystem):
     ) -> Dict[str, Any]:
         """
         Perform comprehensive search using both APIs and web scraping
+        API searches and web scraping are independent, so they run
+        side by side and the total wait is the slower of the two.
         """
         print(f"Starting comprehensive search for: {query}")
 
-        # Step 1: Use original RAG system (APIs)
-        print("Step 1: Searching academic databases via APIs...")
-        api_results = self.comprehensive_search(query, max_results_per_source)
+        # Step 1: Search academic APIs and scrape the web concurrently
+        print("Step 1: Searching academic databases and scraping web sources...")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            api_future = executor.submit(self.comprehensive_search, query, max_results_per_source)
+            web_results = self._gather_sources(query, include_news, custom_urls)
+            api_results = api_future.result()
 
-        # Step 2: Add web scraping results
-        print("Step 2: Scraping web sources...")
-        web_results = self.web_scraper.comprehensive_web_search(
-            query=query,
-            include_news=include_news,
-            include_scholar=True,
-            custom_urls=custom_urls,
-            max_results=50
-        )
-
-        # Step 3: Merge results
-        print("Step 3: Merging and deduplicating results...")
+        # Step 2: Merge results
+        print("Step 2: Merging and deduplicating results...")
         merged_results = self._merge_results(api_results, web_results)
 
-        # Step 4: Re-analyze combined data
-        print("Step 4: Analyzing combined dataset...")
+        # Step 3: Re-analyze combined data
+        print("Step 3: Analyzing combined dataset...")
         merged_results = self._reanalyze_combined_data(merged_results)
 
         print(f"Search complete: {merged_results['total_papers']} papers, {merged_results['total_news']} news articles")
 
         return merged_results
 
+    def _gather_sources(
+        self,
+        query: str,
+        include_news: bool = True,
+        custom_urls: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Scrape Scholar, each news outlet and each custom URL concurrently
+        Returns the same shape as WebScraperSystem.comprehensive_web_search;
+        a failing site is logged and skipped instead of aborting the batch.
+        """
+        scraper = self.web_scraper
+
+        def run(func, *args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                print(f"Error scraping web source: {e}")
+                return None
+
+        news_sources = scraper._news_sources(query) if include_news else []
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_scrapes) as executor:
+            scholar = executor.submit(run, scraper.search_google_scholar, query, max_results=20)
+            news = [
+                executor.submit(run, scraper._scrape_news_source, source, query, max_results=5)
+                for source in news_sources
+            ]
+            custom = [executor.submit(run, scraper.extract_url_content, url) for url in custom_urls or []]
+            academic_news = executor.submit(run, scraper.search_academic_news, query, max_results=10)
+
+        return scraper._build_results(
+            query,
+            academic_papers=scholar.result() or [],
+            news_articles=[article for future in news for article in future.result() or []],
+            custom_content=[future.result() for future in custom],
+            academic_news=academic_news.result() or []
+        )
+
     def _merge_results(
         self,
         api_results: Dict[str, Any],
@@ -89,22 +194,36 @@ class EnhancedRAGWithWeb(EnhancedRAGSystem):
             'research_gaps': []
         }
 
+        papers = merged['papers']
+        apa = merged['bibliography']['apa']
+        bibtex = merged['bibliography']['bibtex']
+        api_papers = api_results.get('papers') or []
+        web_papers = web_results.get('academic_papers') or []
+        # Deduplicate by (near-)identical title, only needed when web papers arrive;
+        # with no API papers the web papers are only checked for exact repeats
+        existing_titles = _TitleIndex(fuzzy=bool(api_papers)) if web_papers else None
+
+        def append_paper(paper: Dict[str, Any], source_key: str = None) -> None:
+            """Add a paper with its citations, indexing its title for dedup"""
+            papers.append(paper)
+            merged['total_papers'] += 1
+            if source_key:
+                merged['sources'][source_key] += 1
+            if 'apa_citation' in paper:
+                apa.append(paper['apa_citation'])
+            if 'bibtex_citation' in paper:
+                bibtex.append(paper['bibtex_citation'])
+
         # Add API papers
-        if 'papers' in api_results:
-            merged['papers'].extend(api_results['papers'])
-            merged['total_papers'] += len(api_results['papers'])
+        for paper in api_papers:
+            append_paper(paper)
+            if existing_titles is not None:
+                existing_titles.add(paper['title'], paper.get('doi') or '')
 
         # Add web-scraped academic papers
-        if 'academic_papers' in web_results:
-            # Deduplicate by title
-            existing_titles = {p['title'].lower() for p in merged['papers']}
-
-            for paper in web_results['academic_papers']:
-                if paper['title'].lower() not in existing_titles:
-                    merged['papers'].append(paper)
-                    existing_titles.add(paper['title'].lower())
-                    merged['total_papers'] += 1
-                    merged['sources']['google_scholar'] += 1
+        for paper in web_papers:
+            if existing_titles.add(paper['title'], paper.get('doi') or ''):
+                append_paper(paper, 'google_scholar')
 
         # Add news articles
         if 'news_articles' in web_results:
@@ -124,13 +243,6 @@ class EnhancedRAGWithWeb(EnhancedRAGSystem):
             if key in api_results:
                 merged[key] = api_results[key]
 
-        # Update bibliographies
-        for paper in merged['papers']:
-            if 'apa_citation' in paper:
-                merged['bibliography']['apa'].append(paper['apa_citation'])
-            if 'bibtex_citation' in paper:
-                merged['bibliography']['bibtex'].append(paper['bibtex_citation'])
-
         return merged
 
     def _reanalyze_combined_data(self, merged_results: Dict[str, Any]) -> Dict[str, Any]:
@@ -142,58 +254,24 @@ class EnhancedRAGWithWeb(EnhancedRAGSystem):
         if not papers:
             return merged_results
 
-        # Update timeline with all papers
+        # Columns of the fields analyzed, so the scan below touches no dicts
+        years = [paper.get('year', 'Unknown') for paper in papers]
+        abstracts = [paper.get('abstract', '') for paper in papers]
+
+        # Timeline, methodologies and datasets in one pass over all papers
         timeline = {}
-        for paper in papers:
-            year = paper.get('year', 'Unknown')
+        methodology_counts = Counter()
+        dataset_counts = Counter()
+        for year, abstract in zip(years, abstracts):
             if year and year != 'Unknown':
                 timeline[str(year)] = timeline.get(str(year), 0) + 1
+            methodology_counts.update(sorted(_METHODOLOGY_MATCHER(abstract), key=_KEYWORD_ORDER.get))
+            dataset_counts.update(sorted(_DATASET_MATCHER(abstract), key=_KEYWORD_ORDER.get))
 
         merged_results['timeline'] = dict(sorted(timeline.items()))
 
-        # Extract methodologies from abstracts
-        methodology_keywords = [
-            'machine learning', 'deep learning', 'neural network', 'CNN', 'RNN',
-            'transformer', 'BERT', 'GPT', 'regression', 'classification',
-            'clustering', 'reinforcement learning', 'supervised', 'unsupervised',
-            'survey', 'experimental', 'simulation', 'statistical analysis'
-        ]
-
-        methodology_counts = {}
-        for paper in papers:
-            abstract = paper.get('abstract', '').lower()
-            for method in methodology_keywords:
-                if method.lower() in abstract:
-                    methodology_counts[method] = methodology_counts.get(method, 0) + 1
-
-        merged_results['methodologies'] = [
-            method for method, count in sorted(
-                methodology_counts.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:15]
-        ]
-
-        # Extract datasets
-        dataset_patterns = [
-            'ImageNet', 'COCO', 'MNIST', 'CIFAR', 'VOC', 'CelebA',
-            'WikiText', 'SQuAD', 'GLUE', 'SuperGLUE', 'CommonCrawl'
-        ]
-
-        dataset_counts = {}
-        for paper in papers:
-            abstract = paper.get('abstract', '')
-            for dataset in dataset_patterns:
-                if dataset in abstract:
-                    dataset_counts[dataset] = dataset_counts.get(dataset, 0) + 1
-
-        merged_results['datasets'] = [
-            dataset for dataset, count in sorted(
-                dataset_counts.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:10]
-        ]
+        merged_results['methodologies'] = [method for method, _ in methodology_counts.most_common(15)]
+        merged_results['datasets'] = [dataset for dataset, _ in dataset_counts.most_common(10)]
 
         return merged_results
 
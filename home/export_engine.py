@@ -12,11 +12,171 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from reportlab.pdfgen import canvas
-from io import BytesIO
+from io import BytesIO, StringIO
 import re
 from typing import Dict, List, Any
 import markdown
+from jinja2 import Environment
+from markupsafe import Markup
 from datetime import datetime
+from functools import lru_cache
+
+
+# A paragraph is a run of lines with no blank line between them
+_PARAGRAPH = re.compile(r'[^\n]+(?:\n(?!\n)[^\n]+)*')
+
+# Markdown constructs converted by _markdown_to_latex
+_MD_H3 = re.compile(r'^### (.+)$', re.MULTILINE)
+_MD_H2 = re.compile(r'^## (.+)$', re.MULTILINE)
+_MD_H1 = re.compile(r'^# (.+)$', re.MULTILINE)
+_MD_BOLD = re.compile(r'\*\*(.+?)\*\*')
+_MD_ITALIC = re.compile(r'\*(.+?)\*')
+_MD_BULLET = re.compile(r'^\- (.+)$', re.MULTILINE)
+
+# In-text citations such as (Author, Year) or (Author et al., Year)
+_CITATION = re.compile(r'\(([A-Z][a-z]+(?:\s+et\s+al\.)?),?\s+\d{4}\)')
+
+# Special LaTeX characters, escaped in a single pass so escapes are not re-escaped
+_LATEX_ESCAPES = str.maketrans({
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '^': r'\^{}',
+    '\\': r'\textbackslash{}',
+})
+
+
+@lru_cache(maxsize=1)
+def _pdf_styles():
+    """Build the PDF paragraph styles once; returns (sample sheet, title, heading, body)"""
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1f4e79'),
+        spaceAfter=30,
+        alignment=1  # Center
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading1'],
+        fontSize=16,
+        textColor=colors.HexColor('#1f4e79'),
+        spaceAfter=12,
+        spaceBefore=12,
+        keepWithNext=True
+    )
+
+    body_style = ParagraphStyle(
+        'CustomBody',
+        parent=styles['Normal'],
+        fontSize=11,
+        leading=16,
+        spaceAfter=12,
+        alignment=4  # Justify
+    )
+
+    return styles, title_style, heading_style, body_style
+
+
+# CSS embedded in HTML exports
+_HTML_STYLES = '''
+<style>
+    body {
+        font-family: 'Times New Roman', Times, serif;
+        max-width: 8.5in;
+        margin: 0 auto;
+        padding: 1in;
+        line-height: 1.6;
+    }
+    .cover-page {
+        text-align: center;
+        padding: 3in 0;
+    }
+    .cover-page h1 {
+        font-size: 24pt;
+        color: #1f4e79;
+        margin-bottom: 0.5in;
+    }
+    .cover-page h2 {
+        font-size: 18pt;
+        color: #4f81bd;
+    }
+    .metadata {
+        font-size: 12pt;
+        color: #666;
+    }
+    .section {
+        page-break-inside: avoid;
+        margin-bottom: 1.5em;
+    }
+    h2 {
+        font-size: 16pt;
+        color: #1f4e79;
+        border-bottom: 2px solid #1f4e79;
+        padding-bottom: 0.2em;
+        margin-top: 1.5em;
+    }
+    p {
+        text-align: justify;
+        margin-bottom: 1em;
+    }
+    .references {
+        padding-left: 1.5em;
+    }
+    .references li {
+        margin-bottom: 0.5em;
+    }
+    @media print {
+        body {
+            padding: 0;
+        }
+        .section {
+            page-break-inside: avoid;
+        }
+    }
+</style>
+'''
+
+# Compiled once; user-supplied text is autoescaped, converted markdown is marked safe
+_HTML_TEMPLATE = Environment(autoescape=True, trim_blocks=True, lstrip_blocks=True).from_string('''\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>{{ title }}</title>
+{{ styles }}
+</head>
+<body>
+<div class="cover-page">
+<h1>{{ title }}</h1>
+<h2>{{ proposal_type }}</h2>
+<p class="metadata">Date: {{ date }}</p>
+</div>
+{% for section in sections %}
+<div class="section">
+<h2>{{ section.name }}</h2>
+{{ section.html }}
+</div>
+{% endfor %}
+<div class="section">
+<h2>References</h2>
+<ol class="references">
+{% for citation in citations %}
+<li>{{ citation }}</li>
+{% endfor %}
+</ol>
+</div>
+</body>
+</html>
+''')
 
 
 class ProposalExportEngine:
@@ -138,21 +298,16 @@ class ProposalExportEngine:
 
     def _add_formatted_content(self, doc: Document, content: str):
         """Add formatted content with markdown support"""
-        # Split into paragraphs
-        paragraphs = content.split('\n\n')
-
-        for para in paragraphs:
-            para = para.strip()
+        # Stream paragraphs (runs of non-blank lines) without splitting up front
+        for match in _PARAGRAPH.finditer(content):
+            para = match.group().strip()
             if not para:
                 continue
 
-            # Check for markdown headings
-            if para.startswith('###'):
-                doc.add_heading(para.replace('###', '').strip(), level=3)
-            elif para.startswith('##'):
-                doc.add_heading(para.replace('##', '').strip(), level=2)
-            elif para.startswith('#'):
-                doc.add_heading(para.replace('#', '').strip(), level=1)
+            # Check for markdown headings; the count of leading '#' is the level
+            level = len(para) - len(para.lstrip('#'))
+            if level:
+                doc.add_heading(para[level:].strip(), level=min(level, 3))
             # Check for bullet points
             elif para.startswith('- ') or para.startswith('* '):
                 lines = para.split('\n')
@@ -164,16 +319,20 @@ class ProposalExportEngine:
                         )
             # Regular paragraph
             else:
-                p = doc.add_paragraph(para)
-                # Add citations formatting
-                p.text = self._format_citations_in_text(p.text)
-
-    def _format_citations_in_text(self, text: str) -> str:
-        """Format citations in text"""
-        # Find patterns like (Author, Year) and make them italic
-        citation_pattern = r'\(([A-Z][a-z]+(?:\s+et\s+al\.)?),?\s+\d{4}\)'
-        # This would need actual citation formatting
-        return text
+                self._add_cited_paragraph(doc, para)
+
+    def _add_cited_paragraph(self, doc: Document, text: str):
+        """Add a paragraph with in-text citations such as (Author, Year) set in italics"""
+        p = doc.add_paragraph()
+        pos = 0
+        for match in _CITATION.finditer(text):
+            if match.start() > pos:
+                p.add_run(text[pos:match.start()])
+            p.add_run(match.group()).italic = True
+            pos = match.end()
+        if pos < len(text):
+            p.add_run(text[pos:])
+        return p
 
     def _add_docx_bibliography(self, doc: Document, proposal_data: Dict):
         """Add bibliography in APA format"""
@@ -208,34 +367,7 @@ class ProposalExportEngine:
         elements = []
 
         # Styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#1f4e79'),
-            spaceAfter=30,
-            alignment=1  # Center
-        )
-
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading1'],
-            fontSize=16,
-            textColor=colors.HexColor('#1f4e79'),
-            spaceAfter=12,
-            spaceBefore=12,
-            keepWithNext=True
-        )
-
-        body_style = ParagraphStyle(
-            'CustomBody',
-            parent=styles['Normal'],
-            fontSize=11,
-            leading=16,
-            spaceAfter=12,
-            alignment=4  # Justify
-        )
+        styles, title_style, heading_style, body_style = _pdf_styles()
 
         # Title page
         elements.append(Spacer(1, 2*inch))
@@ -306,95 +438,83 @@ class ProposalExportEngine:
         """
         Export proposal to LaTeX format
         """
-        latex_parts = []
+        buffer = StringIO()
+
+        def line(text: str = '') -> None:
+            buffer.write(text)
+            buffer.write('\n')
 
         # Document class and packages
-        latex_parts.append(r'\documentclass[11pt,a4paper]{article}')
-        latex_parts.append(r'\usepackage[utf8]{inputenc}')
-        latex_parts.append(r'\usepackage{geometry}')
-        latex_parts.append(r'\usepackage{times}')
-        latex_parts.append(r'\usepackage{hyperref}')
-        latex_parts.append(r'\usepackage{graphicx}')
-        latex_parts.append(r'\usepackage{cite}')
-        latex_parts.append(r'\geometry{margin=1in}')
-        latex_parts.append(r'\setlength{\parindent}{0pt}')
-        latex_parts.append(r'\setlength{\parskip}{1em}')
-        latex_parts.append('')
+        line(r'\documentclass[11pt,a4paper]{article}')
+        line(r'\usepackage[utf8]{inputenc}')
+        line(r'\usepackage{geometry}')
+        line(r'\usepackage{times}')
+        line(r'\usepackage{hyperref}')
+        line(r'\usepackage{graphicx}')
+        line(r'\usepackage{cite}')
+        line(r'\geometry{margin=1in}')
+        line(r'\setlength{\parindent}{0pt}')
+        line(r'\setlength{\parskip}{1em}')
+        line('')
 
         # Title and metadata
-        latex_parts.append(r'\title{' + self._escape_latex(proposal_data.get('title', '')) + '}')
-        latex_parts.append(r'\author{' + self._escape_latex(proposal_data.get('pi_name', '')) + '}')
-        latex_parts.append(r'\date{\today}')
-        latex_parts.append('')
+        line(r'\title{' + self._escape_latex(proposal_data.get('title', '')) + '}')
+        line(r'\author{' + self._escape_latex(proposal_data.get('pi_name', '')) + '}')
+        line(r'\date{\today}')
+        line('')
 
         # Begin document
-        latex_parts.append(r'\begin{document}')
-        latex_parts.append(r'\maketitle')
-        latex_parts.append(r'\tableofcontents')
-        latex_parts.append(r'\newpage')
-        latex_parts.append('')
+        line(r'\begin{document}')
+        line(r'\maketitle')
+        line(r'\tableofcontents')
+        line(r'\newpage')
+        line('')
 
         # Add sections
         sections = proposal_data.get('sections', [])
         for section in sections:
-            latex_parts.append(r'\section{' + self._escape_latex(section['name']) + '}')
-            latex_parts.append('')
+            line(r'\section{' + self._escape_latex(section['name']) + '}')
+            line('')
 
             content = section.get('content', '')
             # Convert markdown to LaTeX
             content = self._markdown_to_latex(content)
-            latex_parts.append(content)
-            latex_parts.append('')
+            line(content)
+            line('')
 
         # Bibliography
-        latex_parts.append(r'\newpage')
-        latex_parts.append(r'\section*{References}')
+        line(r'\newpage')
+        line(r'\section*{References}')
         citations = proposal_data.get('bibliography', {}).get('apa', [])
-        latex_parts.append(r'\begin{enumerate}')
+        line(r'\begin{enumerate}')
         for citation in citations:
-            latex_parts.append(r'\item ' + self._escape_latex(citation))
-        latex_parts.append(r'\end{enumerate}')
+            line(r'\item ' + self._escape_latex(citation))
+        line(r'\end{enumerate}')
 
         # End document
-        latex_parts.append(r'\end{document}')
+        line(r'\end{document}')
 
-        return '\n'.join(latex_parts)
+        return buffer.getvalue()
 
     def _escape_latex(self, text: str) -> str:
         """Escape special LaTeX characters"""
-        replacements = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-            '^': r'\^{}',
-            '\\': r'\textbackslash{}',
-        }
-
-        for old, new in replacements.items():
-            text = text.replace(old, new)
-
-        return text
+        return text.translate(_LATEX_ESCAPES)
 
     def _markdown_to_latex(self, content: str) -> str:
         """Convert markdown content to LaTeX"""
         # Convert headings
-        content = re.sub(r'^### (.+)$', r'\\subsubsection{\1}', content, flags=re.MULTILINE)
-        content = re.sub(r'^## (.+)$', r'\\subsection{\1}', content, flags=re.MULTILINE)
-        content = re.sub(r'^# (.+)$', r'\\section{\1}', content, flags=re.MULTILINE)
+        content = _MD_H3.sub(r'\\subsubsection{\1}', content)
+        content = _MD_H2.sub(r'\\subsection{\1}', content)
+        content = _MD_H1.sub(r'\\section{\1}', content)
 
         # Convert bold
-        content = re.sub(r'\*\*(.+?)\*\*', r'\\textbf{\1}', content)
+        content = _MD_BOLD.sub(r'\\textbf{\1}', content)
 
         # Convert italic
-        content = re.sub(r'\*(.+?)\*', r'\\textit{\1}', content)
+        content = _MD_ITALIC.sub(r'\\textit{\1}', content)
 
         # Convert bullet points
-        content = re.sub(r'^\- (.+)$', r'\\item \1', content, flags=re.MULTILINE)
+        content = _MD_BULLET.sub(r'\\item \1', content)
 
         return content
 
@@ -402,147 +522,67 @@ class ProposalExportEngine:
         """
         Export proposal to clean markdown
         """
-        md_parts = []
+        buffer = StringIO()
+
+        def line(text: str = '') -> None:
+            buffer.write(text)
+            buffer.write('\n')
 
         # Title
-        md_parts.append(f"# {proposal_data.get('title', 'Grant Proposal')}")
-        md_parts.append('')
+        line(f"# {proposal_data.get('title', 'Grant Proposal')}")
+        line('')
 
         # Metadata
-        md_parts.append(f"**Proposal Type:** {proposal_data.get('proposal_type', '')}")
-        md_parts.append(f"**Keywords:** {proposal_data.get('keywords', '')}")
-        md_parts.append(f"**Date:** {datetime.now().strftime('%B %d, %Y')}")
-        md_parts.append('')
-        md_parts.append('---')
-        md_parts.append('')
+        line(f"**Proposal Type:** {proposal_data.get('proposal_type', '')}")
+        line(f"**Keywords:** {proposal_data.get('keywords', '')}")
+        line(f"**Date:** {datetime.now().strftime('%B %d, %Y')}")
+        line('')
+        line('---')
+        line('')
 
         # Sections
         sections = proposal_data.get('sections', [])
         for section in sections:
-            md_parts.append(f"## {section['name']}")
-            md_parts.append('')
-            md_parts.append(section.get('content', ''))
-            md_parts.append('')
-            md_parts.append('---')
-            md_parts.append('')
+            line(f"## {section['name']}")
+            line('')
+            line(section.get('content', ''))
+            line('')
+            line('---')
+            line('')
 
         # Bibliography
-        md_parts.append('## References')
-        md_parts.append('')
+        line('## References')
+        line('')
         citations = proposal_data.get('bibliography', {}).get('apa', [])
         for idx, citation in enumerate(citations, 1):
-            md_parts.append(f"{idx}. {citation}")
-        md_parts.append('')
+            line(f"{idx}. {citation}")
+        line('')
 
-        return '\n'.join(md_parts)
+        return buffer.getvalue()
 
     def export_to_html(self, proposal_data: Dict[str, Any]) -> str:
         """
         Export proposal to professional HTML
         """
-        html_parts = []
-
-        # HTML header
-        html_parts.append('<!DOCTYPE html>')
-        html_parts.append('<html lang="en">')
-        html_parts.append('<head>')
-        html_parts.append('<meta charset="UTF-8">')
-        html_parts.append(f'<title>{proposal_data.get("title", "Grant Proposal")}</title>')
-        html_parts.append(self._get_html_styles())
-        html_parts.append('</head>')
-        html_parts.append('<body>')
-
-        # Title page
-        html_parts.append('<div class="cover-page">')
-        html_parts.append(f'<h1>{proposal_data.get("title", "Grant Proposal")}</h1>')
-        html_parts.append(f'<h2>{proposal_data.get("proposal_type", "")}</h2>')
-        html_parts.append(f'<p class="metadata">Date: {datetime.now().strftime("%B %d, %Y")}</p>')
-        html_parts.append('</div>')
-
-        # Sections
-        sections = proposal_data.get('sections', [])
-        for section in sections:
-            html_parts.append(f'<div class="section">')
-            html_parts.append(f'<h2>{section["name"]}</h2>')
-
-            content = section.get('content', '')
+        # One converter for all sections; reset() clears per-document state
+        md = markdown.Markdown()
+        sections = []
+        for section in proposal_data.get('sections', []):
             # Convert markdown to HTML
-            html_content = markdown.markdown(content)
-            html_parts.append(html_content)
-
-            html_parts.append('</div>')
-
-        # Bibliography
-        html_parts.append('<div class="section">')
-        html_parts.append('<h2>References</h2>')
-        html_parts.append('<ol class="references">')
-        citations = proposal_data.get('bibliography', {}).get('apa', [])
-        for citation in citations:
-            html_parts.append(f'<li>{citation}</li>')
-        html_parts.append('</ol>')
-        html_parts.append('</div>')
-
-        html_parts.append('</body>')
-        html_parts.append('</html>')
-
-        return '\n'.join(html_parts)
+            sections.append({
+                'name': section['name'],
+                'html': Markup(md.reset().convert(section.get('content', '')))
+            })
+
+        return _HTML_TEMPLATE.render(
+            title=proposal_data.get('title', 'Grant Proposal'),
+            proposal_type=proposal_data.get('proposal_type', ''),
+            date=datetime.now().strftime('%B %d, %Y'),
+            styles=Markup(self._get_html_styles()),
+            sections=sections,
+            citations=proposal_data.get('bibliography', {}).get('apa', [])
+        )
 
     def _get_html_styles(self) -> str:
         """Get CSS styles for HTML export"""
-        return '''
-<style>
-    body {
-        font-family: 'Times New Roman', Times, serif;
-        max-width: 8.5in;
-        margin: 0 auto;
-        padding: 1in;
-        line-height: 1.6;
-    }
-    .cover-page {
-        text-align: center;
-        padding: 3in 0;
-    }
-    .cover-page h1 {
-        font-size: 24pt;
-        color: #1f4e79;
-        margin-bottom: 0.5in;
-    }
-    .cover-page h2 {
-        font-size: 18pt;
-        color: #4f81bd;
-    }
-    .metadata {
-        font-size: 12pt;
-        color: #666;
-    }
-    .section {
-        page-break-inside: avoid;
-        margin-bottom: 1.5em;
-    }
-    h2 {
-        font-size: 16pt;
-        color: #1f4e79;
-        border-bottom: 2px solid #1f4e79;
-        padding-bottom: 0.2em;
-        margin-top: 1.5em;
-    }
-    p {
-        text-align: justify;
-        margin-bottom: 1em;
-    }
-    .references {
-        padding-left: 1.5em;
-    }
-    .references li {
-        margin-bottom: 0.5em;
-    }
-    @media print {
-        body {
-            padding: 0;
-        }
-        .section {
-            page-break-inside: avoid;
-        }
-    }
-</style>
-'''
+        return _HTML_STYLES
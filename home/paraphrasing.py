@@ -3,6 +3,8 @@ import random
 import re
 from collections import defaultdict
 
+from .citation_manager import DEFAULT_ARCHITECTURE, DEFAULT_CHALLENGE, DEFAULT_DATASET, DEFAULT_TRAINING
+
 class ParaphrasingEngine:
     def __init__(self, citation_manager):
         self.citation_manager = citation_manager
@@ -47,7 +49,7 @@ class ParaphrasingEngine:
         
         arch_details = facts.get('architecture_details', '')
         
-        if not arch_details or arch_details == 'deep neural network architecture':
+        if not arch_details or arch_details == DEFAULT_ARCHITECTURE:
             return f"{authors} ({year}) developed a neural network-based detection system [{citation_num}]."
         
         components = []
@@ -82,13 +84,13 @@ class ParaphrasingEngine:
         training = facts.get('training_details', '')
         dataset = facts.get('dataset_info', '')
         
-        if training == 'standard training procedure':
-            if dataset and dataset != 'benchmark datasets':
+        if training == DEFAULT_TRAINING:
+            if dataset and dataset != DEFAULT_DATASET:
                 return f"The model was trained on {dataset} [{citation_num}]."
             return f"{authors} ({year}) employed standard training protocols [{citation_num}]."
         
         parts = []
-        if dataset and dataset != 'benchmark datasets':
+        if dataset and dataset != DEFAULT_DATASET:
             parts.append(f"trained on {dataset}")
         
         if training:
@@ -141,7 +143,7 @@ class ParaphrasingEngine:
         
         dataset = facts.get('dataset_info', '')
         
-        if not dataset or dataset == 'benchmark datasets':
+        if not dataset or dataset == DEFAULT_DATASET:
             return f"{authors} ({year}) evaluated their approach on standard benchmark datasets [{citation_num}]."
         
         has_size = '(' in dataset
@@ -185,7 +187,7 @@ class ParaphrasingEngine:
         
         if not contribution or contribution == 'methodological advances in the domain':
             arch = facts.get('architecture_details', '')
-            if arch and arch != 'deep neural network architecture':
+            if arch and arch != DEFAULT_ARCHITECTURE:
                 return f"The key contribution of {authors} ({year}) lies in their novel architectural design incorporating {arch.split(':')[0]} [{citation_num}]."
             return f"{authors} ({year}) contributed methodological innovations to the field [{citation_num}]."
         
@@ -207,7 +209,7 @@ class ParaphrasingEngine:
         
         challenge = facts.get('challenge', '')
         
-        if not challenge or challenge == 'challenges in generalization and robustness across diverse conditions':
+        if not challenge or challenge == DEFAULT_CHALLENGE:
             return f"However, {authors} ({year}) acknowledged limitations in generalization and robustness [{citation_num}]."
         
         if len(challenge) > 120:
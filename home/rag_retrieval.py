@@ -6,7 +6,7 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
 
-from .citation_manager import CitationManager, FactExtractor
+from .citation_manager import CitationManager, FactExtractor, DEFAULT_DATASET
 from .paraphrasing import ParaphrasingEngine, TextPostProcessor
 
 
@@ -333,7 +333,7 @@ class AdvancedPaperAnalyzer:
                     stats['architectures'][arch_name] += 1
             
             dataset = facts.get('dataset_info', '')
-            if dataset and dataset != 'benchmark datasets':
+            if dataset and dataset != DEFAULT_DATASET:
                 dataset_name = dataset.split('(')[0].strip()
                 if dataset_name:
                     stats['datasets'][dataset_name] += 1
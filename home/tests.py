@@ -1,3 +1,314 @@
-from django.test import TestCase
+import asyncio
+import os
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from . import enhanced_rag_system, enhanced_rag_with_web
+from .citation_manager import CitationManager
+from .enhanced_proposal_generator import EnhancedProposalGenerator, _word_count
+from .enhanced_rag_system import _build_keyword_matcher
+from .enhanced_rag_with_web import EnhancedRAGWithWeb, _TitleIndex
+from .export_engine import ProposalExportEngine
+from .generators import ProposalGenerator, _check_template_fields
+from .paraphrasing import ParaphrasingEngine
+
+
+def _completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _Stream:
+    """Minimal stand-in for an OpenAI completion stream"""
+
+    def __init__(self, deltas):
+        self.chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+            for delta in deltas
+        ]
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    def assert_matches(self):
+        matcher = _build_keyword_matcher(('learning', 'deep learning', 'CNN'))
+        self.assertEqual(matcher('we use deep learning and a CNN'), {'learning', 'deep learning', 'CNN'})
+        self.assertEqual(matcher('we use a cnn'), set())
+        self.assertEqual(matcher(''), set())
+
+        folded = _build_keyword_matcher(('CNN', 'BERT'), ignore_case=True)
+        self.assertEqual(folded('a cnn and Bert model'), {'CNN', 'BERT'})
+
+    def test_with_ahocorasick(self):
+        if enhanced_rag_system.ahocorasick is None:
+            self.skipTest('pyahocorasick is not installed')
+        self.assert_matches()
+
+    def test_regex_fallback(self):
+        with mock.patch.object(enhanced_rag_system, 'ahocorasick', None):
+            self.assert_matches()
+
+
+class TitleIndexTests(SimpleTestCase):
+    def test_minhash_catches_near_duplicates(self):
+        if enhanced_rag_with_web.MinHashLSH is None:
+            self.skipTest('datasketch is not installed')
+        index = _TitleIndex()
+
+        self.assertIsNotNone(index.lsh)
+        self.assertTrue(index.add('Attention Is All You Need for Neural Machine Translation'))
+        self.assertFalse(index.add('Attention is all you need for neural machine translation!'))
+        self.assertTrue(index.add('Protein Structure Prediction with Graph Networks'))
+
+    def test_fallback_matches_normalized_titles(self):
+        with mock.patch.object(enhanced_rag_with_web, 'MinHashLSH', None):
+            index = _TitleIndex()
+
+        self.assertIsNone(index.lsh)
+        self.assertTrue(index.add('A Survey of Graph Learning'))
+        self.assertFalse(index.add('A survey of graph learning.'))
+        self.assertTrue(index.add('Graph Learning for Molecules'))
+
+    def test_exact_repeat_is_caught_by_md5(self):
+        index = _TitleIndex()
+
+        self.assertTrue(index.add('A Survey of Graph Learning', '10.1/abc'))
+        self.assertFalse(index.add('A Survey of Graph Learning', '10.1/abc'))
+        self.assertEqual(len(index.seen_md5), 1)
+
+    def test_same_title_with_another_doi_is_still_a_duplicate(self):
+        index = _TitleIndex()
+
+        self.assertTrue(index.add('Deep Learning', '10.1/one'))
+        # Different DOI passes the MD5 tier but the title is a repeat
+        self.assertFalse(index.add('Deep Learning', '10.1/two'))
+        self.assertEqual(len(index.seen_md5), 2)
+
+    def test_exact_index_skips_minhash(self):
+        index = _TitleIndex(fuzzy=False)
+
+        self.assertIsNone(index.lsh)
+        self.assertTrue(index.add('A Survey of Graph Learning', '10.1/abc'))
+        self.assertFalse(index.add('A survey of graph learning.', '10.1/xyz'))
+
+
+class WebSearchTests(SimpleTestCase):
+    def setUp(self):
+        with mock.patch.dict(os.environ, {'RAG_CACHE_TTL': '0'}):
+            self.rag = EnhancedRAGWithWeb()
+        scraper = self.rag.web_scraper
+        for name, value in [
+            ('search_google_scholar', [{'title': 'Scholar paper'}]),
+            ('extract_url_content', {'title': 'Custom page'}),
+            ('search_academic_news', [{'title': 'Academic news'}]),
+        ]:
+            patcher = mock.patch.object(scraper, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(scraper, '_news_sources', return_value=['up', 'down'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def scrape_news(self, source, query, max_results=5):
+        if source == 'down':
+            raise RuntimeError('site down')
+        return [{'title': 'Outlet news'}]
+
+    def test_failing_site_is_skipped(self):
+        with mock.patch.object(self.rag.web_scraper, '_scrape_news_source', side_effect=self.scrape_news):
+            results = self.rag._gather_sources('graphs', custom_urls=['https://example.com'])
+
+        self.assertEqual(results['academic_papers'], [{'title': 'Scholar paper'}])
+        self.assertEqual(results['news_articles'], [{'title': 'Outlet news'}, {'title': 'Academic news'}])
+        self.assertEqual(results['custom_content'], [{'title': 'Custom page'}])
+
+    def test_search_works_inside_a_running_event_loop(self):
+        async def search():
+            return self.rag.comprehensive_search_with_web('graphs')
+
+        with mock.patch.object(self.rag, 'comprehensive_search', return_value={'papers': []}) as api, \
+                mock.patch.object(self.rag.web_scraper, '_scrape_news_source', side_effect=self.scrape_news), \
+                mock.patch.object(self.rag, '_merge_results', return_value={'total_papers': 0, 'total_news': 3}), \
+                mock.patch.object(self.rag, '_reanalyze_combined_data', side_effect=lambda merged: merged):
+            results = asyncio.run(search())
+
+        api.assert_called_once_with('graphs', 50)
+        self.assertEqual(results['total_news'], 3)
+
+
+class HtmlExportTests(SimpleTestCase):
+    def setUp(self):
+        self.html = ProposalExportEngine().export_to_html({
+            'title': '<script>alert(1)</script> & Co',
+            'proposal_type': 'Research <b>Grant</b>',
+            'sections': [
+                {'name': 'Aims & <Scope>', 'content': 'We **will** study *graphs*.'},
+            ],
+            'bibliography': {'apa': ['Smith, J. (2020). <i>Graphs</i> & more.']},
+        })
+
+    def test_user_text_is_escaped(self):
+        self.assertNotIn('<script>', self.html)
+        self.assertIn('&lt;script&gt;alert(1)&lt;/script&gt; &amp; Co', self.html)
+        self.assertIn('Research &lt;b&gt;Grant&lt;/b&gt;', self.html)
+        self.assertIn('Aims &amp; &lt;Scope&gt;', self.html)
+        self.assertIn('Smith, J. (2020). &lt;i&gt;Graphs&lt;/i&gt; &amp; more.', self.html)
+
+    def test_section_markdown_is_rendered(self):
+        self.assertIn('<strong>will</strong>', self.html)
+        self.assertIn('<em>graphs</em>', self.html)
+        self.assertIn('<style>', self.html)
+
+
+class CompletionCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.generator = EnhancedProposalGenerator(api_key='test-key')
+
+    def test_sampled_completion_is_served_from_cache(self):
+        with mock.patch.object(
+            self.generator, '_create_completion', return_value=_completion('cached text')
+        ) as create:
+            first = self.generator._complete('system', 'user', temperature=0.7)
+            second = self.generator._complete('system', 'user', temperature=0.7)
+
+        self.assertEqual((first, second), ('cached text', 'cached text'))
+        self.assertEqual(create.call_count, 1)
+
+    def test_temperature_is_part_of_the_key(self):
+        with mock.patch.object(
+            self.generator, '_create_completion',
+            side_effect=[_completion('warm'), _completion('cool')]
+        ) as create:
+            warm = self.generator._complete('system', 'user', temperature=0.7)
+            cool = self.generator._complete('system', 'user', temperature=0.6)
+
+        self.assertEqual((warm, cool), ('warm', 'cool'))
+        self.assertEqual(create.call_count, 2)
+
+    def test_ignore_cache_regenerates_and_replaces_the_entry(self):
+        with mock.patch.object(
+            self.generator, '_create_completion',
+            side_effect=[_completion('first'), _completion('second')]
+        ) as create:
+            self.generator._complete('system', 'user', temperature=0.7)
+            regenerated = self.generator._complete('system', 'user', temperature=0.7, ignore_cache=True)
+            cached = self.generator._complete('system', 'user', temperature=0.7)
+
+        self.assertEqual((regenerated, cached), ('second', 'second'))
+        self.assertEqual(create.call_count, 2)
+
+    def test_stream_is_cached_and_replayed_as_one_delta(self):
+        stream = _Stream(['Hello', ', ', 'world'])
+        with mock.patch.object(self.generator, '_create_completion', return_value=stream) as create:
+            streamed = list(self.generator._stream_complete('system', 'user', temperature=0.7))
+            replayed = list(self.generator._stream_complete('system', 'user', temperature=0.7))
+
+        self.assertEqual(streamed, ['Hello', ', ', 'world'])
+        self.assertEqual(replayed, ['Hello, world'])
+        self.assertEqual(create.call_count, 1)
+        self.assertTrue(stream.closed)
+
+    def test_ignore_cache_streams_a_fresh_completion(self):
+        with mock.patch.object(
+            self.generator, '_create_completion',
+            side_effect=[_Stream(['one']), _Stream(['two'])]
+        ) as create:
+            list(self.generator._stream_complete('system', 'user', temperature=0.7))
+            fresh = list(self.generator._stream_complete('system', 'user', temperature=0.7, ignore_cache=True))
+
+        self.assertEqual(fresh, ['two'])
+        self.assertEqual(create.call_count, 2)
+
+    def test_default_cache_evicts_least_recently_used(self):
+        cache = self.generator.cache
+        cache.maxsize = 2
+        cache['a'] = 1
+        cache['b'] = 2
+        cache.get('a')
+        cache['c'] = 3
+
+        self.assertEqual(list(cache), ['a', 'c'])
+
+
+class BatchBudgetTests(SimpleTestCase):
+    def setUp(self):
+        self.generator = EnhancedProposalGenerator(api_key='test-key')
+
+    def template(self, name, max_words):
+        return SimpleNamespace(
+            section_name=name, description='', prompt_template='Write it.',
+            min_words=max_words // 2, max_words=max_words,
+            proposal_type=SimpleNamespace(name='Research Grant')
+        )
+
+    def test_groups_are_budgeted_by_maximum_length(self):
+        templates = [self.template(name, 1000) for name in 'ABC'] + [self.template('D', 0)]
+        groups = self.generator._group_templates_for_batch(templates)
+
+        self.assertEqual([[t.section_name for t in group] for group in groups], [['A', 'B'], ['C'], ['D']])
+
+    def test_batched_request_sizes_max_tokens_to_the_group(self):
+        templates = [self.template('Aims', 500), self.template('Impact', 300)]
+        rag_context = SimpleNamespace(papers=[], memo={})
+        reply = '{"Aims": "a", "Impact": "b"}'
+        with mock.patch.object(self.generator, '_complete', return_value=reply) as complete:
+            sections = self.generator._generate_sections_batched(
+                templates, 'Title', 'Description', 'Context', rag_context
+            )
+
+        self.assertEqual(sections, {'Aims': 'a', 'Impact': 'b'})
+        system_prompt = complete.call_args.args[0]
+        self.assertTrue(system_prompt.startswith(self.generator._build_system_prompt('Research Grant')))
+        self.assertEqual(complete.call_args.kwargs['max_tokens'], (800 + 128 + 64) + (480 + 128 + 64))
+
+
+class WordCountTests(SimpleTestCase):
+    def test_counts_words_separated_by_any_whitespace(self):
+        self.assertEqual(_word_count('one two\tthree\nfour  five\r\nsix'), 6)
+
+    def test_empty_text_has_no_words(self):
+        self.assertEqual(_word_count(''), 0)
+        self.assertEqual(_word_count('   \n\t'), 0)
+        self.assertEqual(_word_count(None), 0)
+
+
+class ProposalStateTests(SimpleTestCase):
+    def setUp(self):
+        # Skip __init__, which loads the retrieval models
+        self.generator = ProposalGenerator.__new__(ProposalGenerator)
+        self.generator.citation_manager = CitationManager()
+        self.generator.paraphraser = ParaphrasingEngine(self.generator.citation_manager)
+        self.generator._phrase_idx = 2
+
+    def test_each_proposal_numbers_its_own_citations(self):
+        first = self.generator._for_proposal()
+        second = self.generator._for_proposal()
+
+        self.assertEqual(first.citation_manager.add_citation({'title': 'A'}), 1)
+        self.assertEqual(first.citation_manager.add_citation({'title': 'B'}), 2)
+        self.assertEqual(second.citation_manager.add_citation({'title': 'B'}), 1)
+        self.assertIs(first.paraphraser.citation_manager, first.citation_manager)
+        self.assertEqual(self.generator.citation_manager.citations, [])
+
+    def test_phrase_rotation_restarts_per_proposal(self):
+        phrases = ('first', 'second', 'third')
+        self.generator._for_proposal()._next_phrase(phrases)
+
+        self.assertEqual(self.generator._for_proposal()._next_phrase(phrases), 'first')
+        self.assertEqual(self.generator._phrase_idx, 2)
+
+
+class SectionTemplateTests(SimpleTestCase):
+    def test_known_fields_pass(self):
+        _check_template_fields('{kw} for {title}: {desc150} {{literal}} {transition}', 'transition')
+
+    def test_unknown_field_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, 'syntheses'):
+            _check_template_fields('{kw} {syntheses}', 'transition')
@@ -1,9 +1,20 @@
-from typing import List
+from typing import List, Tuple
+from functools import lru_cache
 import matplotlib.pyplot as plt
 import pandas as pd
 import os
 
 
+@lru_cache(maxsize=16)
+def _objectives_table(objectives: Tuple[str, ...]) -> str:
+    rows = ''.join([f'<tr><td>{i}</td><td>{obj}</td></tr>' for i, obj in enumerate(objectives, 1)])
+    return f'''
+<table class="academic-table">
+<thead><tr><th>Obj. #</th><th>Description</th></tr></thead>
+<tbody>{rows}</tbody>
+</table>'''
+
+
 class TableGenerator:
     """
     Generates HTML tables for web display and matplotlib charts for export.
@@ -14,12 +25,8 @@ class TableGenerator:
     # =========================
     @staticmethod
     def generate_objectives_table(objectives: List[str]) -> str:
-        rows = ''.join([f'<tr><td>{i}</td><td>{obj}</td></tr>' for i, obj in enumerate(objectives, 1)])
-        return f'''
-<table class="academic-table">
-<thead><tr><th>Obj. #</th><th>Description</th></tr></thead>
-<tbody>{rows}</tbody>
-</table>'''
+        # Rendered once per distinct objective list; proposals reuse the same list
+        return _objectives_table(tuple(objectives))
 
     @staticmethod
     def generate_timeline_table() -> str:
@@ -3,6 +3,7 @@ Comprehensive Web Scraping System
 Scrapes from multiple sources: Google Scholar, arXiv, news sites, and custom URLs
 """
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 from newspaper import Article
 from urllib.parse import urlparse, quote_plus
@@ -26,10 +27,14 @@ class WebScraperSystem:
 
     def __init__(self):
         self.ua = UserAgent()
+        # Pooled keep-alive connections reused by every scrape
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': self.ua.random
         })
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
     def comprehensive_web_search(
         self,
@@ -42,35 +47,41 @@ class WebScraperSystem:
         """
         Perform comprehensive web search across all sources
         """
-        results = {
-            'academic_papers': [],
-            'news_articles': [],
-            'custom_content': [],
-            'total_sources': 0,
-            'query': query,
-            'timestamp': time.time()
-        }
-
         # 1. Google Scholar search
-        if include_scholar:
-            scholar_results = self.search_google_scholar(query, max_results=20)
-            results['academic_papers'].extend(scholar_results)
+        scholar_results = self.search_google_scholar(query, max_results=20) if include_scholar else []
 
         # 2. News sources
-        if include_news:
-            news_results = self.search_news_sources(query, max_results=15)
-            results['news_articles'].extend(news_results)
+        news_results = self.search_news_sources(query, max_results=15) if include_news else []
 
         # 3. Custom URLs
-        if custom_urls:
-            for url in custom_urls:
-                content = self.extract_url_content(url)
-                if content:
-                    results['custom_content'].append(content)
+        custom_content = [self.extract_url_content(url) for url in custom_urls or []]
 
         # 4. Academic news
         academic_news = self.search_academic_news(query, max_results=10)
-        results['news_articles'].extend(academic_news)
+
+        return self._build_results(query, scholar_results, news_results, custom_content, academic_news)
+
+    @staticmethod
+    def _build_results(
+        query: str,
+        academic_papers: List[Dict],
+        news_articles: List[Dict],
+        custom_content: List[Dict],
+        academic_news: List[Dict]
+    ) -> Dict[str, Any]:
+        """
+        Assemble the comprehensive_web_search result from each source's output
+        Outlet news is capped at 15 before academic news is appended; empty
+        custom URL extractions are dropped.
+        """
+        results = {
+            'academic_papers': list(academic_papers),
+            'news_articles': list(news_articles)[:15] + list(academic_news),
+            'custom_content': [content for content in custom_content if content],
+            'total_sources': 0,
+            'query': query,
+            'timestamp': time.time()
+        }
 
         results['total_sources'] = (
             len(results['academic_papers']) +
@@ -97,7 +108,7 @@ class WebScraperSystem:
                 'Accept-Language': 'en-US,en;q=0.9',
             }
 
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, headers=headers, timeout=10)
             time.sleep(2)  # Be respectful
 
             if response.status_code == 200:
@@ -178,6 +189,19 @@ class WebScraperSystem:
         """
         articles = []
 
+        for source in self._news_sources(query):
+            try:
+                articles.extend(
+                    self._scrape_news_source(source, query, max_results=5)
+                )
+                time.sleep(3)  # Be respectful
+            except Exception as e:
+                print(f"Error scraping {source['name']}: {e}")
+
+        return articles[:max_results]
+
+    def _news_sources(self, query: str) -> List[Dict]:
+        """News sites searched for a query"""
         news_sources = [
             {
                 'name': 'BBC News',
@@ -196,16 +220,7 @@ class WebScraperSystem:
             }
         ]
 
-        for source in news_sources[:2]:  # Limit to avoid rate limits
-            try:
-                articles.extend(
-                    self._scrape_news_source(source, query, max_results=5)
-                )
-                time.sleep(3)  # Be respectful
-            except Exception as e:
-                print(f"Error scraping {source['name']}: {e}")
-
-        return articles[:max_results]
+        return news_sources[:2]  # Limit to avoid rate limits
 
     def _scrape_news_source(
         self,
@@ -222,7 +237,7 @@ class WebScraperSystem:
                 'Accept': 'text/html',
             }
 
-            response = requests.get(source['search_url'], headers=headers, timeout=10)
+            response = self.session.get(source['search_url'], headers=headers, timeout=10)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
@@ -264,7 +279,7 @@ class WebScraperSystem:
         # ScienceDaily search
         try:
             url = f"https://www.sciencedaily.com/search/?keyword={quote_plus(query)}"
-            response = requests.get(url, headers={'User-Agent': self.ua.random}, timeout=10)
+            response = self.session.get(url, headers={'User-Agent': self.ua.random}, timeout=10)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
@@ -305,8 +320,11 @@ class WebScraperSystem:
         Extract content from any URL using newspaper3k
         """
         try:
+            response = self.session.get(url, headers={'User-Agent': self.ua.random}, timeout=10)
+            response.raise_for_status()
+
             article = Article(url)
-            article.download()
+            article.download(input_html=response.text)
             article.parse()
             article.nlp()
 
@@ -333,7 +351,7 @@ class WebScraperSystem:
         """
         try:
             url = f"https://arxiv.org/abs/{arxiv_id}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
 
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')